@@ -0,0 +1,239 @@
+import asyncio
+import types
+
+import discord
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.client.round_trips += 1
+        results = []
+        for name, args, kwargs in self.commands:
+            results.append(getattr(self.client, f'_{name}')(*args, **kwargs))
+
+        self.commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        command = getattr(self, f'_{name}')
+
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            return command(*args, **kwargs)
+
+        return call
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+    def _publish(self, channel, message):
+        self.published.append((channel, message))
+        return 1
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+
+        self.data[key] = _encode(value)
+        return True
+
+    def _expire(self, key, seconds):
+        return int(key in self.data)
+
+    def _eval(self, script, numkeys, *args):
+        # Supports the compare-and-act scripts: GET KEYS[1] == ARGV[1], then act.
+        key, value = args[0], _encode(args[numkeys])
+        if self.data.get(key) != value:
+            return 0
+
+        if "'del'" in script:
+            return self._delete(key)
+        return self._expire(key, args[numkeys + 1])
+
+    def _delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def _sadd(self, key, *members):
+        values = self.data.setdefault(key, set())
+        before = len(values)
+        values.update(_encode(member) for member in members)
+        return len(values) - before
+
+    def _srem(self, key, *members):
+        values = self.data.get(key, set())
+        before = len(values)
+        values.difference_update(_encode(member) for member in members)
+        return before - len(values)
+
+    def _smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def _rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(_encode(value) for value in values)
+        return len(items)
+
+    def _lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def _exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def _zadd(self, key, mapping):
+        scores = self.data.setdefault(key, {})
+        added = sum(_encode(member) not in scores for member in mapping)
+        scores.update({_encode(member): float(score) for member, score in mapping.items()})
+        return added
+
+    def _zincrby(self, key, amount, member):
+        scores = self.data.setdefault(key, {})
+        scores[_encode(member)] = scores.get(_encode(member), 0.0) + amount
+        return scores[_encode(member)]
+
+    def _zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.data.get(key, {}).items(), key=lambda item: (-item[1], item[0]))
+        ranked = ranked[start:] if end == -1 else ranked[start:end + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+
+class FakeRole:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeUser:
+    def __init__(self, user_id: int, dm_latency: float = 0.0, roles=()):
+        self.id = user_id
+        self.name = f'player{user_id}'
+        self.display_name = f'Player {user_id}'
+        self.roles = [FakeRole(role) for role in roles]
+
+        self.dm_latency = dm_latency
+        self.messages = []
+
+    async def send(self, content=None, file=None):
+        if self.dm_latency:
+            await asyncio.sleep(self.dm_latency)
+        self.messages.append((content, file))
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.messages = []
+
+    async def send(self, content=None, file=None, **kwargs):
+        self.messages.append(content)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, members=()):
+        self.id = guild_id
+        self.members = {member.id: member for member in members}
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    async def query_members(self, user_ids=(), limit=5):
+        return [self.members[user_id] for user_id in user_ids if user_id in self.members]
+
+
+class FakeContext:
+    def __init__(self, channel: FakeChannel, guild: FakeGuild, author: FakeUser):
+        self.channel = channel
+        self.guild = guild
+        self.author = author
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        self.replies.append(content)
+
+    async def send(self, content=None, **kwargs):
+        await self.channel.send(content, **kwargs)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.messages = []
+
+    async def defer(self, **kwargs):
+        pass
+
+    async def send_message(self, content=None, **kwargs):
+        self.messages.append(content)
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content=None, **kwargs):
+        self.messages.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, channel: FakeChannel, guild: FakeGuild, user: FakeUser):
+        self.channel = channel
+        self.guild = guild
+        self.user = user
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+class FakeBot:
+    def __init__(self, users=()):
+        self.users = {user.id: user for user in users}
+        self.shard_count = None
+        self.shard_id = None
+
+    def get_user(self, user_id: int):
+        return self.users.get(user_id)
+
+    async def fetch_user(self, user_id: int):
+        if user_id not in self.users:
+            raise discord.NotFound(types.SimpleNamespace(status=404, reason='Not Found'), 'Unknown User')
+
+        return self.users[user_id]
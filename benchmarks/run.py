@@ -0,0 +1,172 @@
+"""Micro-benchmarks for the render and game-state hot paths.
+
+    python -m benchmarks.run --save     # record benchmarks/baseline.json
+    python -m benchmarks.run            # compare against it, exit 1 on regressions
+
+Baselines are machine specific, record one on the host you compare on.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+from bingo.helpers import encoding, render
+from bingo.main import Session
+
+TEMPLATE = "template.png"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    # Each benchmark is a setup function returning the callable to time.
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class BenchUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"player {user_id}"
+        self.display_name = self.name
+
+
+def tiles(count: int):
+    return [{'id': n, 'name': f"Tile number {n} with a longer title", 'secret': n % 7 == 0}
+            for n in range(count)]
+
+
+def session_with_players(tiles_count: int, players_count: int):
+    session = Session(TEMPLATE, tiles(tiles_count), tiles_set_id=1)
+    for user_id in range(players_count):
+        session.add_player(BenchUser(user_id))
+
+    return session
+
+
+@benchmark("render.render_field")
+def bench_render_field():
+    titles = iter(f"Field title {n} that wraps twice" for n in range(10 ** 9))
+    return lambda: render.render_field(next(titles))
+
+
+@benchmark("render.mark_field")
+def bench_mark_field():
+    field = render.render_field("Marked field")
+    return lambda: render.mark_field(field.copy())
+
+
+@benchmark("render.compose_job")
+def bench_compose_job():
+    session = session_with_players(50, 1)
+    player = next(iter(session.players.values()))
+    return lambda: render.compose_job(player.render_job())
+
+
+def bench_encode(profile_name: str):
+    board = render.compose_job(render.RenderJob(TEMPLATE, tuple(f"Tile {n}" for n in range(24)),
+                                                marked_mask=0b1010101))
+    return lambda: encoding.encode(board, profile_name)
+
+
+for _profile_name in encoding.PROFILES:
+    benchmark(f"encoding.encode[{_profile_name}]")(
+        lambda profile_name=_profile_name: bench_encode(profile_name)
+    )
+
+
+for _tiles_count in (50, 500, 5000):
+    benchmark(f"Session[{_tiles_count} tiles]")(
+        lambda tiles_count=_tiles_count: lambda: Session(TEMPLATE, tiles(tiles_count), tiles_set_id=1)
+    )
+
+
+@benchmark("Session.add_player[1000 players]")
+def bench_add_player():
+    return lambda: session_with_players(500, 1000)
+
+
+@benchmark("Field.mark[5000 players]")
+def bench_field_mark():
+    sessions = iter(lambda: session_with_players(100, 5000), None)
+
+    def run():
+        session = next(sessions)
+        start = time.perf_counter()
+        for field in session.fields[:30]:
+            field.mark()
+        return time.perf_counter() - start
+
+    return run
+
+
+def measure(setup, repeats: int) -> float:
+    function = setup()
+    function()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        # Benchmarks with an expensive setup report their own timing.
+        timings.append(result if isinstance(result, float) else elapsed)
+
+    return statistics.median(timings)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float):
+    regressions = []
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        if previous and seconds > previous * (1 + threshold):
+            regressions.append((name, previous, seconds))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the render and game-state hot paths.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown against the baseline, 0.25 is 25%%")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("-k", dest="keyword", default="", help="only run benchmarks containing this text")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.keyword in name:
+            results[name] = measure(setup, args.repeats)
+            print(f"{name:<40} {results[name] * 1000:>10.3f} ms")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, previous, seconds in regressions:
+        print(f"REGRESSION {name}: {previous * 1000:.3f} ms -> {seconds * 1000:.3f} ms")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Headless load simulator for the BingoGame cog.
+
+Drives the real cog with fake Discord objects, an in-memory SQLite database
+and a fake Redis: N players join with /bingo, the admin marks tiles with
+/mark and stops the game, then latency, loop lag, memory and DM throughput
+are reported.
+
+    python -m benchmarks.simulate --players 5000 --marks 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.fakes import (FakeBot, FakeChannel, FakeContext, FakeGuild,
+                              FakeInteraction, FakeRedis, FakeUser)
+from database import model
+from database.repository import create_engine
+
+CHANNEL_ID = 1
+GUILD_ID = 1
+ADMIN_ID = 10 ** 9
+TEMPLATE = "template.png"
+
+
+def percentile(values, fraction: float):
+    if not values:
+        return None
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags = []
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(loop.time() - start - self.interval)
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+
+class Simulation:
+    def __init__(self, args):
+        self.args = args
+        self.latencies = defaultdict(list)
+
+        self.channel = FakeChannel(CHANNEL_ID)
+        self.admin = FakeUser(ADMIN_ID, roles=['Administracja'])
+        self.players = [FakeUser(user_id, dm_latency=args.dm_latency)
+                        for user_id in range(1, args.players + 1)]
+        self.guild = FakeGuild(GUILD_ID, self.players + [self.admin])
+        self.bot = FakeBot(self.players + [self.admin])
+
+    async def timed(self, command: str, coroutine):
+        start = time.perf_counter()
+        await coroutine
+        self.latencies[command].append(time.perf_counter() - start)
+
+    async def setup(self):
+        # Imported late so RENDER_EXECUTOR and friends from the CLI apply.
+        from cogs.bingo_game import BingoGame
+
+        engine = create_engine('sqlite://')
+        model.Base.metadata.create_all(engine)
+
+        self.cog = BingoGame(self.bot, engine=engine, redis_client=FakeRedis())
+        await self.cog.cog_load()
+
+        await self.cog.repository.add_tileset(CHANNEL_ID, 'tiles', [
+            {'name': f'Tile number {n}', 'secret': n % 10 == 0} for n in range(self.args.tiles)
+        ])
+        await self.cog.repository.add_template(CHANNEL_ID, 'default', TEMPLATE)
+
+    async def run(self):
+        await self.setup()
+        context = FakeContext(self.channel, self.guild, self.admin)
+
+        await self.timed('start', self.cog.start_game.callback(self.cog, context, 'default', 'tiles'))
+
+        for batch_start in range(0, len(self.players), self.args.join_batch):
+            batch = self.players[batch_start:batch_start + self.args.join_batch]
+            await asyncio.gather(*(
+                self.timed('bingo', self.cog.bingo.callback(
+                    self.cog, FakeInteraction(self.channel, self.guild, player)))
+                for player in batch
+            ))
+
+        session = self.cog.sessions[CHANNEL_ID]
+        titles = [field.title for field in session.fields[:self.args.marks]]
+
+        marks_started = time.perf_counter()
+        for title in titles:
+            interaction = FakeInteraction(self.channel, self.guild, self.admin)
+            await self.timed('mark', self.cog.mark.callback(self.cog, interaction, field_name=title))
+            await asyncio.sleep(self.args.mark_interval)
+
+        await self.cog.dispatcher.join()
+        delivery_seconds = time.perf_counter() - marks_started
+        winners = len(session.winners)
+
+        await self.timed('stop', self.cog.stop_game.callback(self.cog, context))
+        await self.timed('statistics', self.cog.statistics.callback(self.cog, context))
+
+        dispatcher = self.cog.dispatcher.metrics()
+        await self.cog.cog_unload()
+
+        return {
+            'players': self.args.players,
+            'tiles': self.args.tiles,
+            'marks': len(titles),
+            'winners': winners,
+            'latency_ms': {
+                command: {
+                    'count': len(values),
+                    'p50': percentile(values, 0.5) * 1000,
+                    'p99': percentile(values, 0.99) * 1000,
+                } for command, values in self.latencies.items()
+            },
+            'dm': {
+                'sent': dispatcher['sent'],
+                'failed': dispatcher['failed'],
+                'coalesced': dispatcher['coalesced'],
+                'per_second': dispatcher['sent'] / delivery_seconds if delivery_seconds else None,
+                'latency_p50_ms': (dispatcher['latency_p50'] or 0) * 1000,
+                'latency_p99_ms': (dispatcher['latency_p99'] or 0) * 1000,
+            },
+        }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, render workers show up as children once reaped.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {'bot': own / 1024, 'render_workers': children / 1024}
+
+
+async def simulate(args):
+    monitor = LoopLagMonitor()
+    monitor.start()
+    try:
+        report = await Simulation(args).run()
+    finally:
+        await monitor.stop()
+
+    report['loop_lag_ms'] = {
+        'p50': (percentile(monitor.lags, 0.5) or 0) * 1000,
+        'p99': (percentile(monitor.lags, 0.99) or 0) * 1000,
+        'max': max(monitor.lags, default=0) * 1000,
+    }
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a bingo game against the real cog.")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--tiles", type=int, default=100)
+    parser.add_argument("--marks", type=int, default=30)
+    parser.add_argument("--join-batch", type=int, default=100,
+                        help="players joining concurrently")
+    parser.add_argument("--mark-interval", type=float, default=0.0,
+                        help="seconds between two /mark commands")
+    parser.add_argument("--dm-latency", type=float, default=0.005,
+                        help="simulated Discord latency of one DM")
+    parser.add_argument("--dm-rate", type=float, default=None)
+    parser.add_argument("--render-executor", choices=["process", "thread"], default=None)
+    args = parser.parse_args(argv)
+
+    if args.dm_rate is not None:
+        os.environ['DM_RATE'] = str(args.dm_rate)
+    if args.render_executor is not None:
+        os.environ['RENDER_EXECUTOR'] = args.render_executor
+
+    json.dump(asyncio.run(simulate(args)), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
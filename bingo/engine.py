@@ -0,0 +1,116 @@
+from array import array
+from typing import Iterable, List
+
+import numpy as np
+
+BOARD_SIZE = 5
+CENTER_CELL = 12
+BOARD_FIELDS = 24
+
+_BOARD_STEP = np.uint64(0x9E3779B97F4A7C15)
+_FIELD_STEP = np.uint64(0xD1B54A32D192ED03)
+
+
+def _winning_lines():
+    rows = [sum(1 << (row * BOARD_SIZE + col) for col in range(BOARD_SIZE))
+            for row in range(BOARD_SIZE)]
+    cols = [sum(1 << (row * BOARD_SIZE + col) for row in range(BOARD_SIZE))
+            for col in range(BOARD_SIZE)]
+    diagonals = [sum(1 << (n * BOARD_SIZE + n) for n in range(BOARD_SIZE)),
+                 sum(1 << (n * BOARD_SIZE + BOARD_SIZE - 1 - n) for n in range(BOARD_SIZE))]
+
+    return tuple(rows + cols + diagonals)
+
+
+WINNING_LINES = _winning_lines()
+_LINES = np.array(WINNING_LINES, dtype=np.uint32)
+
+
+def board_cell(index: int) -> int:
+    # Boards hold 24 fields, the free center cell is skipped.
+    return index + 1 if index >= CENTER_CELL else index
+
+
+def has_bingo(state: int) -> bool:
+    return any(state & line == line for line in WINNING_LINES)
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer, uint64 arithmetic wraps around by design.
+    keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return keys ^ (keys >> np.uint64(31))
+
+
+def generate_boards(seed: int, fields_count: int, first: int, count: int = 1) -> np.ndarray:
+    # Board k of a session is the 24 fields with the smallest hash of
+    # (seed, k, field), so any board can be rebuilt from its number alone.
+    with np.errstate(over='ignore'):
+        numbers = np.arange(first, first + count, dtype=np.uint64)[:, None]
+        fields = np.arange(fields_count, dtype=np.uint64)[None, :]
+
+        board_keys = _mix(np.uint64(seed) + numbers * _BOARD_STEP)
+        keys = _mix(board_keys + fields * _FIELD_STEP)
+
+    selected = np.argpartition(keys, BOARD_FIELDS - 1, axis=1)[:, :BOARD_FIELDS]
+    order = np.take_along_axis(keys, selected, axis=1).argsort(axis=1)
+
+    return np.take_along_axis(selected, order, axis=1).astype(np.uint32)
+
+
+class BoardMatrix:
+    def __init__(self, fields_count: int, capacity: int = 64):
+        # One packed 25-bit board per player row, rows follow join order.
+        self.states = np.zeros(capacity, dtype=np.uint32)
+        self.won = np.zeros(capacity, dtype=bool)
+        self.count = 0
+
+        # Packed uint32 arrays, a list of ints would box every entry.
+        self.field_rows: List[array] = [array('I') for _ in range(fields_count)]
+        self.field_bits: List[array] = [array('I') for _ in range(fields_count)]
+
+    def _grow(self):
+        capacity = len(self.states) * 2
+        self.states = np.resize(self.states, capacity)
+        self.won = np.resize(self.won, capacity)
+        self.won[self.count:] = False
+
+    def add(self, field_indexes: Iterable[int], marked_fields: Iterable[int] = ()) -> int:
+        if self.count == len(self.states):
+            self._grow()
+
+        row = self.count
+        self.count += 1
+
+        marked_fields = set(marked_fields)
+        state = 1 << CENTER_CELL
+        for index, field_index in enumerate(field_indexes):
+            bit = 1 << board_cell(index)
+            self.field_rows[field_index].append(row)
+            self.field_bits[field_index].append(bit)
+
+            if field_index in marked_fields:
+                state |= bit
+
+        self.states[row] = state
+        self.won[row] = has_bingo(state)
+
+        return row
+
+    def state(self, row: int) -> int:
+        return int(self.states[row])
+
+    def mark(self, field_index: int) -> np.ndarray:
+        rows = np.array(self.field_rows[field_index], dtype=np.intp)
+        if not len(rows):
+            return rows
+
+        # A field sits on a board at most once, so rows are unique.
+        self.states[rows] |= np.array(self.field_bits[field_index], dtype=np.uint32)
+
+        candidates = rows[~self.won[rows]]
+        states = self.states[candidates, None]
+        winners = candidates[((states & _LINES) == _LINES).any(axis=1)]
+        self.won[winners] = True
+
+        return np.sort(winners)
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._items = OrderedDict()
+
+    def get(self, key: Hashable, factory: Callable):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return value
+
+        value = factory()
+        self._items[key] = value
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._items),
+            'maxsize': self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
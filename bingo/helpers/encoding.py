@@ -0,0 +1,93 @@
+import io
+import time
+from typing import Callable, NamedTuple
+
+from PIL import Image
+
+
+class EncodingProfile(NamedTuple):
+    name: str
+    extension: str
+    save: Callable[[Image.Image, io.BytesIO], None]
+
+
+class EncodedBoard(NamedTuple):
+    data: bytes
+    extension: str
+    seconds: float
+    compose_seconds: float = 0.0
+    tile_seconds: float = 0.0
+
+
+def _save_png(image: Image.Image, output: io.BytesIO):
+    image.save(output, 'PNG')
+
+
+def _save_png_fast(image: Image.Image, output: io.BytesIO):
+    image.save(output, 'PNG', compress_level=1)
+
+
+def _save_png_palette(image: Image.Image, output: io.BytesIO):
+    # Boards are a template plus white text and one mark colour,
+    # 256 colours keep them visually lossless at half the size.
+    image.quantize(256, method=Image.Quantize.FASTOCTREE).save(output, 'PNG', compress_level=6)
+
+
+def _save_webp_lossless(image: Image.Image, output: io.BytesIO):
+    image.save(output, 'WEBP', lossless=True, method=4, quality=0)
+
+
+PROFILES = {
+    profile.name: profile for profile in (
+        EncodingProfile('png', 'png', _save_png),
+        EncodingProfile('png-fast', 'png', _save_png_fast),
+        EncodingProfile('png-palette', 'png', _save_png_palette),
+        EncodingProfile('webp-lossless', 'webp', _save_webp_lossless),
+    )
+}
+DEFAULT_PROFILE = 'png'
+
+
+def get_profile(name: str) -> EncodingProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown encoding profile: {name}") from None
+
+
+def encode(image: Image.Image, profile_name: str = DEFAULT_PROFILE) -> EncodedBoard:
+    profile = get_profile(profile_name)
+
+    output = io.BytesIO()
+    start = time.perf_counter()
+    profile.save(image, output)
+
+    return EncodedBoard(output.getvalue(), profile.extension,
+                        time.perf_counter() - start)
+
+
+class EncodingStats:
+    def __init__(self):
+        self.profiles: dict[str, dict[str, float]] = {}
+
+    def record(self, profile_name: str, board: EncodedBoard):
+        stats = self.profiles.setdefault(profile_name, {'count': 0, 'bytes': 0, 'seconds': 0.0})
+        stats['count'] += 1
+        stats['bytes'] += len(board.data)
+        stats['seconds'] += board.seconds
+
+    def summary(self):
+        return {
+            name: {
+                'count': stats['count'],
+                'average_bytes': stats['bytes'] / stats['count'],
+                'average_seconds': stats['seconds'] / stats['count'],
+            } for name, stats in self.profiles.items()
+        }
+
+
+stats = EncodingStats()
+
+
+def measure(image: Image.Image):
+    return {name: encode(image, name) for name in PROFILES}
@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from bingo.helpers import encoding, render
+from utils import metrics
+
+EXECUTOR_KINDS = ("process", "thread")
+
+
+class RenderExecutor:
+    def __init__(self, kind: str = "process", workers: int = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown render executor: {kind}")
+
+        self.kind = kind
+        self.workers = workers
+        self.pool: Executor = self._create_pool()
+
+    def _create_pool(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+
+        return ThreadPoolExecutor(max_workers=self.workers,
+                                  thread_name_prefix="bingo-render")
+
+    async def render(self, job: render.RenderJob) -> encoding.EncodedBoard:
+        loop = asyncio.get_running_loop()
+        board = await loop.run_in_executor(self.pool, render.render_job, job)
+
+        encoding.stats.record(job.encoding, board)
+        metrics.BOARD_ENCODE_SECONDS.observe(board.seconds, profile=job.encoding)
+        metrics.BOARD_BYTES.inc(len(board.data), profile=job.encoding)
+        metrics.BOARD_COMPOSITE_SECONDS.observe(board.compose_seconds)
+        if board.tile_seconds:
+            metrics.TILE_RENDER_SECONDS.observe(board.tile_seconds)
+
+        return board
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
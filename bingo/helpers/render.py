@@ -3,10 +3,26 @@ from PIL import Image, ImageFont, ImageDraw, \
 import re
 
 import textwrap
+import time
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+from bingo.helpers import encoding
+from bingo.helpers.cache import LRUCache
+from bingo.helpers.templates import TemplateStore
 
 TEMPLATE_DIR = "templates/"
 FONT_DIR = "statics/fonts/"
 DEFAULT_FONT = "Roboto-Regular.ttf"
+MARK_FILE = "mark.png"
+SECRET_TITLE = "TOP SECRET"
+
+FIELD_PLAIN = "plain"
+FIELD_SECRET = "secret"
+FIELD_MARKED = "marked"
+
+# 144x144 RGBA tile is ~81 KiB, so the cache tops out around 80 MiB.
+TILE_CACHE_SIZE = 1024
 
 FIELD_WIDTH, FIELD_HEIGHT = 144, 144
 FIELD_TEXT_WIDTH = 12
@@ -44,9 +60,13 @@ FIELDS_LOCATION_PATTERN = [
 ]
 
 
+templates = TemplateStore(TEMPLATE_DIR)
+
+
 def check_template_file(name: str):
+    # Decoding here warms the store, so the first board does not pay for it.
     try:
-        Image.open(TEMPLATE_DIR + name).load()
+        templates.get(name)
     except FileNotFoundError:
         return False
     except UnidentifiedImageError:
@@ -55,23 +75,49 @@ def check_template_file(name: str):
     return True
 
 
-def render_field(name: str):
-    field = Image.new('RGBA', (FIELD_WIDTH, FIELD_HEIGHT))
-    draw = ImageDraw.Draw(field)
+_measure_draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+
 
+@lru_cache(maxsize=None)
+def get_font(size: int, font_name: str = DEFAULT_FONT):
+    return ImageFont.truetype(FONT_DIR + font_name, size)
+
+
+def _fits(text: str, size: int):
+    _, _, b_x, b_y = _measure_draw.multiline_textbbox((0, 0), text, font=get_font(size))
+    return b_x < FIELD_WIDTH and b_y < FIELD_HEIGHT, (b_x, b_y)
+
+
+@lru_cache(maxsize=4096)
+def fit_text(name: str):
     wrapped_name = textwrap.wrap(name, FIELD_TEXT_WIDTH)
     text = "\n".join(wrapped_name)
 
-    font_object = None
-    b_x, b_y = None, None
+    # The bbox grows with the font size, so the largest fitting size
+    # can be found by bisecting instead of walking down from the top.
+    low, high = 0, MAXIMUM_FONT_SIZE - 1
+    font_size, bbox = 0, None
+    while low <= high:
+        middle = (low + high) // 2
+        fits, middle_bbox = _fits(text, middle)
+
+        if fits:
+            font_size, bbox = middle, middle_bbox
+            low = middle + 1
+        else:
+            high = middle - 1
 
-    for font_size in reversed(range(MAXIMUM_FONT_SIZE)):
-        font_object = ImageFont.truetype(FONT_DIR + DEFAULT_FONT, font_size)
-        _, _, b_x, b_y = draw.multiline_textbbox((0, 0), text, font=font_object)
+    if bbox is None:
+        bbox = _fits(text, font_size)[1]
 
-        if b_x < FIELD_WIDTH and \
-                b_y < FIELD_HEIGHT:
-            break
+    return text, font_size, bbox
+
+
+def render_field(name: str):
+    field = Image.new('RGBA', (FIELD_WIDTH, FIELD_HEIGHT))
+    draw = ImageDraw.Draw(field)
+
+    text, font_size, (b_x, b_y) = fit_text(name)
 
     line_x_pos = (FIELD_WIDTH - b_x) / 2
     line_y_pos = (FIELD_HEIGHT - b_y) / 2
@@ -79,7 +125,7 @@ def render_field(name: str):
     draw.text((line_x_pos, line_y_pos),
               text,
               fill=(255, 255, 255),
-              font=font_object,
+              font=get_font(font_size),
               align='center',
               )
 
@@ -87,24 +133,75 @@ def render_field(name: str):
 
 
 def mark_field(field: Image.Image):
-    with Image.open(TEMPLATE_DIR + "mark.png") as mark:
-        mark_x_pos = (field.width - mark.width) // 2
-        mark_y_pos = (field.height - mark.height) // 2
+    mark = templates.get(MARK_FILE)
+    mark_x_pos = (field.width - mark.width) // 2
+    mark_y_pos = (field.height - mark.height) // 2
 
-        field.paste(mark,
-                    (mark_x_pos,
-                     mark_y_pos),
-                    mark)
+    field.paste(mark,
+                (mark_x_pos,
+                 mark_y_pos),
+                mark)
 
     return field
 
 
-def render_template(template_name: str, players_board):
-    template = Image.open(TEMPLATE_DIR + template_name)
-    for n in range(24):
-        template.paste(players_board[n].rendered_field,
-                       (FIELDS_LOCATION_PATTERN[n][0][0],
-                        FIELDS_LOCATION_PATTERN[n][0][1]),
-                       players_board[n].rendered_field)
+tile_cache = LRUCache(TILE_CACHE_SIZE)
+
+# Seconds spent drawing uncached tiles in this process, render workers
+# report the difference per job since their own metrics are not exported.
+tile_seconds = 0.0
+
+
+def get_field(title: str, variant: str = FIELD_PLAIN):
+    # Cached bitmaps are shared between sessions, never draw on them.
+    if variant == FIELD_SECRET:
+        title, variant = SECRET_TITLE, FIELD_PLAIN
+
+    def factory():
+        global tile_seconds
+
+        start = time.perf_counter()
+        field = render_field(title)
+        if variant == FIELD_MARKED:
+            field = mark_field(field)
+
+        tile_seconds += time.perf_counter() - start
+        return field
+
+    return tile_cache.get((title, variant, DEFAULT_FONT, MARK_FILE), factory)
+
+
+class RenderJob(NamedTuple):
+    template_name: str
+    titles: Tuple[str, ...]
+    secret_mask: int = 0
+    marked_mask: int = 0
+    encoding: str = encoding.DEFAULT_PROFILE
+
+
+def compose_job(job: RenderJob) -> Image.Image:
+    board = templates.copy(job.template_name)
+    for n, title in enumerate(job.titles):
+        if job.marked_mask >> n & 1:
+            variant = FIELD_MARKED
+        elif job.secret_mask >> n & 1:
+            variant = FIELD_SECRET
+        else:
+            variant = FIELD_PLAIN
+
+        field = get_field(title, variant)
+        board.paste(field, tuple(FIELDS_LOCATION_PATTERN[n][0]), field)
+
+    return board
+
+
+def render_job(job: RenderJob) -> encoding.EncodedBoard:
+    tiles_before = tile_seconds
+    start = time.perf_counter()
+    board = compose_job(job)
+    compose_seconds = time.perf_counter() - start
 
-    return template
+    return encoding.encode(board, job.encoding)._replace(
+        compose_seconds=compose_seconds,
+        tile_seconds=tile_seconds - tiles_before,
+    )
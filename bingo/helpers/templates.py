@@ -0,0 +1,97 @@
+import hashlib
+import io
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+RAW_DIR = "raw/"
+RAW_MAGIC = b'RGBA'
+RAW_HEADER = struct.Struct('>4sII')
+
+
+class TemplateStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._images: dict[str, Image.Image] = {}
+
+    def raw_path(self, name: str) -> str:
+        return f'{self.directory}{RAW_DIR}{os.path.splitext(name)[0]}.rgba'
+
+    def save(self, data: bytes) -> str:
+        # Templates are named by content, identical uploads share one file.
+        name = f'{hashlib.sha256(data).hexdigest()}.png'
+        path = self.directory + name
+
+        with Image.open(io.BytesIO(data)) as source:
+            image = source.convert('RGBA')
+
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        if not os.path.exists(self.raw_path(name)):
+            self._write_raw(name, image)
+
+        return name
+
+    def _write_raw(self, name: str, image: Image.Image):
+        os.makedirs(self.directory + RAW_DIR, exist_ok=True)
+        _write_atomic(self.raw_path(name),
+                      RAW_HEADER.pack(RAW_MAGIC, *image.size) + image.tobytes())
+
+    def _map_raw(self, name: str):
+        try:
+            with open(self.raw_path(name), 'rb') as f:
+                raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        magic, width, height = RAW_HEADER.unpack_from(raw)
+        if magic != RAW_MAGIC or len(raw) != RAW_HEADER.size + width * height * 4:
+            raw.close()
+            return None
+
+        # Pixels stay in the page cache and are shared by every worker process,
+        # the image keeps the mapping alive through the buffer it wraps.
+        return Image.frombuffer('RGBA', (width, height), memoryview(raw)[RAW_HEADER.size:],
+                                'raw', 'RGBA', 0, 1)
+
+    def _decode(self, name: str) -> Image.Image:
+        with Image.open(self.directory + name) as source:
+            image = source.convert('RGBA')
+
+        try:
+            self._write_raw(name, image)
+        except OSError:
+            pass
+
+        return image
+
+    def get(self, name: str) -> Image.Image:
+        # Returned image is shared and may be read-only, use copy() before drawing on it.
+        image = self._images.get(name)
+        if image is None:
+            image = self._map_raw(name) or self._decode(name)
+            self._images[name] = image
+
+        return image
+
+    def copy(self, name: str) -> Image.Image:
+        return self.get(name).copy()
+
+    def invalidate(self, name: str = None):
+        if name is None:
+            self._images.clear()
+        else:
+            self._images.pop(name, None)
+
+    def __contains__(self, name: str):
+        return name in self._images
+
+
+def _write_atomic(path: str, data: bytes):
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+
+    os.replace(temporary_path, path)
@@ -0,0 +1,66 @@
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+NGRAM_SIZE = 3
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Iterable[str]:
+    return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+
+class FieldIndex:
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.by_title: Dict[str, object] = {}
+        self.casefolded: List[str] = []
+
+        for field in self.fields:
+            self.by_title.setdefault(field.title, field)
+            self.casefolded.append(field.title.casefold())
+
+        self.active = bytearray(b'\x01') * len(self.fields)
+
+        # Trigram postings are built on the first long query, sessions that
+        # never autocomplete do not pay for them.
+        self._postings: Optional[Dict[str, array]] = None
+
+    @property
+    def postings(self) -> Dict[str, array]:
+        if self._postings is None:
+            postings = {}
+            for n, title in enumerate(self.casefolded):
+                for gram in ngrams(title):
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array('I')
+                    posting.append(n)
+
+            self._postings = postings
+
+        return self._postings
+
+    def get(self, title: str):
+        return self.by_title.get(title)
+
+    def discard(self, field):
+        self.active[field.index] = 0
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        if len(query) < NGRAM_SIZE:
+            return range(len(self.fields))
+
+        # Every match contains each query trigram, the rarest one bounds the scan.
+        return min((self.postings.get(gram, ()) for gram in ngrams(query)), key=len)
+
+    def search(self, query: str, limit: int = 25) -> List:
+        query = query.casefold()
+
+        # Postings and the scan are in field order, so the first hits are the lowest indexes.
+        results = []
+        for n in self._candidates(query):
+            if self.active[n] and query in self.casefolded[n]:
+                results.append(self.fields[n])
+                if len(results) == limit:
+                    break
+
+        return results
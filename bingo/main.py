@@ -1,11 +1,19 @@
 import random
+from array import array
 from datetime import datetime
 from copy import copy
 
 from typing import List
 from discord import User
 
-from bingo.helpers import render
+from bingo.engine import BOARD_FIELDS, BoardMatrix, generate_boards, has_bingo
+from bingo.index import FieldIndex
+from bingo.helpers import encoding, render
+
+# Join storms draw boards in batches, sized so one batch hashes about
+# 64k (board, field) pairs however large the tile set is.
+BOARD_BATCH_KEYS = 1 << 16
+MAX_BOARD_BATCH = 256
 
 
 class TemplateNotFoundError(Exception):
@@ -21,128 +29,170 @@ class UserIsExactlyPlayerError(Exception):
 
 
 class Field:
-    def render(self):
-        title = "TOP SECRET" if self.is_secret else self.title
-        return render.render_field(title)
+    __slots__ = ('session', 'index', 'tile_id', 'title', 'is_secret',
+                 'marked', 'marked_at', 'is_sent')
 
-    def __init__(self, session, title: str, secret: bool = False):
+    def __init__(self, session, index: int, title: str, secret: bool = False, tile_id: int = None):
         self.session = session
+        self.index = index
+        self.tile_id = tile_id
         self.title = title
         self.is_secret = secret
 
         self.marked = False
+        self.marked_at = None
         self.is_sent = False
-        self.players = set()
 
-        self.rendered_field = self.render()
-
-    def mark(self):
+    def mark(self, timestamp: datetime = None):
         if self.marked:
-            return
-
-        if self.is_secret:
-            self.rendered_field = render.render_field(self.title)
-
-        self.rendered_field = render.mark_field(self.rendered_field)
+            return []
 
+        self.marked = True
+        self.marked_at = timestamp or datetime.now()
         self.session.marked_fields.append(self)
+        self.session.field_index.discard(self)
 
-        for player in self.players:
-            player.mark(self)
-
-        self.marked = True
+        return self.session.record_winners(self.session.boards.mark(self.index), self.marked_at)
 
     def __iter__(self):
         return self.title
 
 
 class Player:
+    # A board is its number in the session, images are composed when sent.
+    __slots__ = ('session', 'user', 'joined_at', 'username', 'number', 'row',
+                 'won', 'victory_timestamp', 'victory_place')
+
     def render(self):
-        self.rendered_board = render.render_template(self.session.template_name,
-                                                     self.board)
-        return self.rendered_board
+        return render.compose_job(self.render_job())
+
+    def render_job(self, encoding_profile: str = encoding.DEFAULT_PROFILE):
+        board = self.board
+        secret_mask, marked_mask = 0, 0
+        for n, field in enumerate(board):
+            secret_mask |= field.is_secret << n
+            marked_mask |= field.marked << n
 
-    def __init__(self, session, user):
+        return render.RenderJob(self.session.template_name,
+                                tuple(field.title for field in board),
+                                secret_mask, marked_mask, encoding_profile)
+
+    def __init__(self, session, user, number: int, timestamp: datetime = None):
         self.session: Session = session
         self.user: User = user
+        self.joined_at = timestamp or datetime.now()
 
         self.username: str = copy(self.user.display_name)
 
-        self.bingo = {
-            "rows": [0, 0, 1, 0, 0],
-            "cols": [0, 0, 1, 0, 0],
-            "diagonal": [1, 1],
-        }
-        self.board = session.generate_board(self)
-        self.rendered_board = self.render()
+        self.number = number
+        self.row = session.boards.add(self.cells,
+                                      [field.index for field in session.marked_fields])
 
         self.won = False
         self.victory_timestamp = None
         self.victory_place = None
 
-    def mark(self, field: Field):
-        if field not in self.board or \
-           self.won:
-            return
-
-        index = self.board.index(field)
-        if index >= 12:
-            index += 1
-
-        row = index // 5
-        col = index - (row * 5)
+    @property
+    def cells(self) -> List[int]:
+        return self.session.board_cells(self.number)
 
-        self.bingo["rows"][row] += 1
-        self.bingo["cols"][col] += 1
+    @property
+    def board(self) -> List[Field]:
+        fields = self.session.fields
+        return [fields[index] for index in self.cells]
 
-        if row == col:
-            self.bingo["diagonal"][0] += 1
-        elif row + col == 4:
-            self.bingo["diagonal"][1] += 1
+    @property
+    def state(self):
+        return self.session.boards.state(self.row)
 
-    def check(self, looser: bool = False):
-        self.won = 5 in self.bingo["rows"] or \
-                   5 in self.bingo["cols"] or \
-                   5 in self.bingo["diagonal"]
-
-        if self.won and not looser:
-            self.victory_timestamp = datetime.now()
-
-            self.session.winners.append(self)
-            self.victory_place = self.session.winners.index(self) + 1
+    def has_bingo(self):
+        return has_bingo(self.state)
 
+    def check(self):
+        # Wins are detected by the session when a field is marked.
         return self.won
 
 
 class Session:
-    def __init__(self, template_name: str, fields: List[str], tiles_set_id: int):
+    def __init__(self, template_name: str, fields: List[str], tiles_set_id: int, seed: int = None):
         self.template_name = template_name
         self.fields: List[dict[str, str]] = fields
         self.tiles_set_id = tiles_set_id
 
-        self.fields: List[Field] = [Field(self, field['name'],
-                                          secret=field['secret']) for field in self.fields]
+        self.fields: List[Field] = [Field(self, n, field['name'],
+                                          secret=field['secret'],
+                                          tile_id=field.get('id')) for n, field in enumerate(self.fields)]
         self.marked_fields = []
+        self.field_index = FieldIndex(self.fields)
 
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.boards_issued = 0
+        self.board_batch = array('I')
+        self.board_batch_start = 0
+
+        self.boards = BoardMatrix(len(self.fields))
         self.players: dict[User, Player] = {}
-        self.winners: List[User] = []
+        self.rows: List[Player] = []
+        self.winners: List[Player] = []
 
         if not render.check_template_file(self.template_name):
             raise TemplateNotFoundError("Template not found")
 
-    def generate_board(self, player: Player):
-        selected_fields = random.sample(self.fields, 24)
-        for selected_field in selected_fields:
-            selected_field.players.add(player)
+    def next_board(self) -> int:
+        number = self.boards_issued
+        self.boards_issued += 1
+
+        if not self._batch_has(number):
+            count = max(1, min(MAX_BOARD_BATCH, BOARD_BATCH_KEYS // len(self.fields)))
+            self.board_batch = array('I', generate_boards(self.seed, len(self.fields),
+                                                          number, count).ravel())
+            self.board_batch_start = number
+
+        return number
+
+    def _batch_has(self, number: int) -> bool:
+        offset = (number - self.board_batch_start) * BOARD_FIELDS
+        return 0 <= offset < len(self.board_batch)
+
+    def board_cells(self, number: int) -> List[int]:
+        if self._batch_has(number):
+            offset = (number - self.board_batch_start) * BOARD_FIELDS
+            return self.board_batch[offset:offset + BOARD_FIELDS].tolist()
 
-        return selected_fields
+        return generate_boards(self.seed, len(self.fields), number)[0].tolist()
 
-    def add_player(self, discord_user: User):
+    def players_on(self, field: Field) -> List[Player]:
+        return [self.rows[row] for row in self.boards.field_rows[field.index]]
+
+    def add_player(self, discord_user: User, board_number: int = None,
+                   timestamp: datetime = None):
         if discord_user in self.players:
             raise UserIsExactlyPlayerError("Discord user is a player exactly")
 
-        self.players[discord_user] = Player(self, discord_user)
-        for marked_field in self.marked_fields:
-            self.players[discord_user].mark(marked_field)
+        if board_number is None:
+            board_number = self.next_board()
+        else:
+            self.boards_issued = max(self.boards_issued, board_number + 1)
+
+        player = Player(self, discord_user, board_number, timestamp)
+        self.players[discord_user] = player
+        self.rows.append(player)
+
+        # Joining late can already complete a line with the marked fields.
+        if self.boards.won[player.row]:
+            self.record_winners([player.row], player.joined_at)
+
+        return player
+
+    def record_winners(self, rows, victory_timestamp: datetime) -> List[Player]:
+        winners = []
+        for row in rows:
+            player = self.rows[row]
+            player.won = True
+            player.victory_timestamp = victory_timestamp
+
+            self.winners.append(player)
+            player.victory_place = len(self.winners)
+            winners.append(player)
 
-        return self.players[discord_user]
+        return winners
@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from discord import User
+
+from bingo.main import Player, Session
+
+# A session is stored as its metadata plus an append-only event log:
+#   "j <user_id> <joined_at> <board number>"
+#   "m <field index> <marked_at>"
+# Boards are rebuilt from the session seed and their number. Replaying the
+# log in order restores marks and the exact winner order, since winners
+# are detected deterministically on every event.
+JOIN_EVENT = 'j'
+MARK_EVENT = 'm'
+
+
+def encode_meta(session: Session, guild_id: int = None) -> str:
+    return json.dumps({
+        'template': session.template_name,
+        'tiles_set_id': session.tiles_set_id,
+        'seed': session.seed,
+        'guild_id': guild_id,
+        'tiles': [[field.tile_id, field.title, field.is_secret] for field in session.fields],
+    }, separators=(',', ':'))
+
+
+def decode_meta(data) -> dict:
+    return json.loads(data)
+
+
+def encode_join(player: Player) -> str:
+    return f'{JOIN_EVENT} {player.user.id} {player.joined_at.timestamp()} {player.number}'
+
+
+def encode_mark(field) -> str:
+    return f'{MARK_EVENT} {field.index} {field.marked_at.timestamp()}'
+
+
+def _decode_event(event) -> List[str]:
+    if isinstance(event, bytes):
+        event = event.decode()
+
+    return event.split(' ')
+
+
+def player_ids(log: Iterable) -> List[int]:
+    return [int(parts[1]) for parts in map(_decode_event, log) if parts[0] == JOIN_EVENT]
+
+
+def restore(meta: dict, log: Iterable, users: Dict[int, User]) -> Session:
+    session = Session(
+        template_name=meta['template'],
+        fields=[{'id': tile_id, 'name': name, 'secret': secret}
+                for tile_id, name, secret in meta['tiles']],
+        tiles_set_id=meta['tiles_set_id'],
+        seed=meta['seed'],
+    )
+
+    for parts in map(_decode_event, log):
+        timestamp = datetime.fromtimestamp(float(parts[2]))
+
+        if parts[0] == JOIN_EVENT:
+            session.add_player(users[int(parts[1])], board_number=int(parts[3]),
+                               timestamp=timestamp)
+        elif parts[0] == MARK_EVENT:
+            field = session.fields[int(parts[1])]
+            field.mark(timestamp)
+            field.is_sent = True
+
+    return session
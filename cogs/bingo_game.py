@@ -1,56 +1,214 @@
 import io
 import asyncio
-from PIL.Image import Image
+import functools
+import logging
 from typing import List
 
+import aiohttp
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from bingo.main import Session as BingoSession
 from bingo.main import TemplateNotFoundError
-
-from sqlalchemy import create_engine
-from sqlalchemy import select
-from sqlalchemy import func, desc, exists, and_
-from sqlalchemy.exc import NoResultFound, MultipleResultsFound
-from sqlalchemy.orm import Session
+from bingo import snapshot
+from bingo.helpers import encoding, render
+from bingo.helpers.executor import RenderExecutor
 
 from sqlalchemy_utils import database_exists, create_database
 
-import redis
-import json
 
-from database import model
+from database.catalog import Catalog
+from database.repository import Repository, create_engine
 from os import environ
 
-from utils import helpers
+from utils import helpers, metrics
+from utils.delivery import DMDispatcher
+from utils.notifications import WinnerNotifier, create_redis_client, winner_event
+from utils.session_store import SessionStore
+from utils.leaderboard import Leaderboard, TOP_PLAYERS
+from utils.sharding import ChannelOwnership, shard_for_guild
 
-from PIL import Image
+from PIL import UnidentifiedImageError
 
 import i18n
 
+logger = logging.getLogger(__name__)
+
+
+def board_to_file(board: encoding.EncodedBoard):
+    return discord.File(io.BytesIO(board.data), filename=f"bingo.{board.extension}")
+
+
+class MissingUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f'Unknown player ({user_id})'
+        self.display_name = self.name
 
-def render_to_io(render: Image):
-    output = io.BytesIO()
-    render.save(output, 'PNG')
-    output.seek(0)
+    async def send(self, *args, **kwargs):
+        pass
 
-    return output
+    # Same identity as discord.User, so the account still maps to its player.
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self):
+        return self.id >> 22
 
 
 class BingoGame(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, engine=None, redis_client=None):
         self.bot = bot
         self.sessions: dict[int, BingoSession] = {}
 
-        self.engine = create_engine(environ.get('DB_URI'))
+        self.engine = engine or create_engine(environ.get('DB_URI'))
         self.__validate_database()
+        self.repository = Repository(self.engine)
+        self.catalog = Catalog(self.repository)
+
+        self.redis_client = redis_client or create_redis_client()
+        self.notifier = WinnerNotifier(self.redis_client)
+        self.store = SessionStore(self.redis_client)
+        self.ownership = ChannelOwnership(self.redis_client)
+        self.leaderboard = Leaderboard(self.redis_client, self.repository)
+        self.pending_restores: set[int] = set()
+
+        render_workers = environ.get('RENDER_WORKERS')
+        self.renderer = RenderExecutor(
+            kind=environ.get('RENDER_EXECUTOR', 'process'),
+            workers=int(render_workers) if render_workers else None,
+        )
+        self.board_encoding = encoding.get_profile(
+            environ.get('BOARD_ENCODING', encoding.DEFAULT_PROFILE)
+        ).name
+
+        self.dispatcher = DMDispatcher(
+            workers=int(environ.get('DM_WORKERS', 8)),
+            rate=float(environ.get('DM_RATE', 40)),
+        )
 
-        self.redis_client = redis.StrictRedis(host='redis', port=6379, db=0)
+        metrics_port = environ.get('METRICS_PORT')
+        self.metrics_port = int(metrics_port) if metrics_port else None
+        self.metrics_server = None
 
         i18n.load_path.append("messages")
 
+    async def cog_load(self):
+        self.dispatcher.start()
+        metrics.REGISTRY.add_collector(self.collect_metrics)
+        if self.metrics_port:
+            self.metrics_server = await metrics.start_server(self.metrics_port)
+
+        await self.restore_sessions()
+        self.keep_ownership.start()
+
+    def owns_guild(self, guild_id: int) -> bool:
+        if guild_id is None or not self.bot.shard_count:
+            return True
+
+        shard_ids = getattr(self.bot, 'shard_ids', None)
+        if not shard_ids:
+            # AutoShardedBot without SHARD_IDS runs every shard, shard_ids stays None.
+            shard_ids = [self.bot.shard_id] if self.bot.shard_id is not None else range(self.bot.shard_count)
+        return shard_for_guild(guild_id, self.bot.shard_count) in shard_ids
+
+    async def restore_sessions(self):
+        for channel_id in await self.store.channel_ids():
+            if channel_id not in self.sessions:
+                await self.restore_session(channel_id)
+
+    async def restore_session(self, channel_id: int):
+        try:
+            loaded = await self.store.load_session(channel_id)
+            if loaded is None:
+                self.pending_restores.discard(channel_id)
+                return
+
+            meta, log = loaded
+            if not self.owns_guild(meta.get('guild_id')):
+                return
+
+            # The lease may still belong to a worker that is shutting down.
+            if not await self.ownership.claim(channel_id):
+                self.pending_restores.add(channel_id)
+                return
+
+            try:
+                users = await self.resolve_users(set(snapshot.player_ids(log)))
+            except discord.HTTPException as error:
+                logger.warning('Could not fetch the players of channel %s, retrying: %s', channel_id, error)
+                self.pending_restores.add(channel_id)
+                return
+
+            # Only ids and marks are replayed, boards render on first use.
+            self.sessions[channel_id] = snapshot.restore(meta, log, users)
+            self.pending_restores.discard(channel_id)
+        except Exception:
+            logger.exception('Could not restore the game on channel %s', channel_id)
+            self.pending_restores.discard(channel_id)
+            await self.ownership.release(channel_id)
+
+    async def resolve_users(self, user_ids) -> dict:
+        users = {user_id: self.bot.get_user(user_id) for user_id in user_ids}
+        missing = [user_id for user_id, user in users.items() if user is None]
+
+        fetched = await asyncio.gather(*(self.bot.fetch_user(user_id) for user_id in missing),
+                                       return_exceptions=True)
+        for user_id, user in zip(missing, fetched):
+            if isinstance(user, discord.NotFound):
+                # Deleted accounts keep their place in the game, they just get no DMs.
+                logger.warning('Player %s no longer exists', user_id)
+                user = MissingUser(user_id)
+            elif isinstance(user, BaseException):
+                raise user
+
+            users[user_id] = user
+
+        return users
+
+    @tasks.loop(seconds=10)
+    async def keep_ownership(self):
+        # An exception would stop the loop for good and let every lease expire.
+        try:
+            await self.renew_ownership()
+        except Exception:
+            logger.exception('Could not renew channel ownership')
+
+    async def renew_ownership(self):
+        lost = await self.ownership.renew(list(self.sessions))
+        for channel_id in lost:
+            logger.warning('Lost ownership of channel %s, dropping the local game', channel_id)
+            self.sessions.pop(channel_id, None)
+
+        for channel_id in list(self.pending_restores):
+            await self.restore_session(channel_id)
+
+    async def cog_unload(self):
+        self.keep_ownership.cancel()
+        metrics.REGISTRY.remove_collector(self.collect_metrics)
+        if self.metrics_server is not None:
+            await self.metrics_server.cleanup()
+        await self.dispatcher.stop()
+        self.renderer.shutdown()
+        self.repository.shutdown()
+        await self.redis_client.aclose()
+
+    def collect_metrics(self):
+        metrics.SESSION_PLAYERS.values.clear()
+        metrics.SESSION_FIELDS.values.clear()
+        for channel_id, session in self.sessions.items():
+            metrics.SESSION_PLAYERS.set(len(session.players), channel=channel_id)
+            metrics.SESSION_FIELDS.set(len(session.fields), channel=channel_id)
+
+        metrics.DM_QUEUE_DEPTH.set(len(self.dispatcher.mailboxes))
+        for name, value in render.tile_cache.stats().items():
+            metrics.TILE_CACHE.set(value, stat=name)
+
+    async def render_board_file(self, player):
+        board = await self.renderer.render(player.render_job(self.board_encoding))
+        return board_to_file(board)
+
     def __validate_database(self):
         if not database_exists(self.engine.url):
             create_database(self.engine.url)
@@ -64,39 +222,27 @@ class BingoGame(commands.Cog):
     @commands.command('upload_tiles')
     @commands.has_role('Administracja')
     async def upload_tiles(self, ctx: commands.Context, name: str, pastebin_url: str):
-        if not helpers.is_name_valid:
+        if not helpers.is_name_valid(name):
             return await ctx.reply('A name has invalid characters!')
 
         if not helpers.is_pastebin_url(pastebin_url):
             return await ctx.reply('Required is a URL starting with: https://pasetbin.com/raw/...')
 
-        with Session(self.engine) as session:
-            already_exists = session.query(exists().where(and_(
-                model.TileSet.name == name,
-                model.TileSet.channel_id == ctx.channel.id
-            ))).scalar()
-
-        if already_exists:
+        if await self.repository.tileset_exists(ctx.channel.id, name):
             return await ctx.reply(f'Name {name} is taken!')
 
-        downloaded_tiles = helpers.download_tileset(pastebin_url)
+        try:
+            downloaded_tiles = await helpers.download_tileset(pastebin_url)
+        except helpers.DownloadTooLargeError:
+            return await ctx.reply('The tiles file is too large!')
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return await ctx.reply('Could not download the tiles file, try again later!')
+
         if len(downloaded_tiles) < 24:
             return await ctx.reply('The number of submitted tiles is less than 24!')
 
-        with Session(self.engine) as session:
-            tiles = model.TileSet(
-                name=name,
-                channel_id=ctx.channel.id,
-                tiles=[
-                    model.Tile(
-                        name=tile['name'],
-                        secret=tile['secret']
-                    ) for tile in downloaded_tiles
-                ]
-            )
-
-            session.add_all([tiles])
-            session.commit()
+        await self.repository.add_tileset(ctx.channel.id, name, downloaded_tiles)
+        self.catalog.invalidate_tileset(ctx.channel.id, name)
 
         return await ctx.reply('Added new set of tiles!')
 
@@ -107,16 +253,10 @@ class BingoGame(commands.Cog):
         if not helpers.is_name_valid(name):
             return await ctx.reply('A name has invalid characters!')
 
-        with Session(self.engine) as session:
-            already_exists = session.query(exists().where(and_(
-                model.Template.name == name,
-                model.Template.channel_id == ctx.channel.id
-            ))).scalar()
-
-        if already_exists:
+        if await self.repository.template_exists(ctx.channel.id, name):
             return await ctx.reply(f'Name {name} is taken!')
 
-        if len(ctx.message.attachments) < 0:
+        if len(ctx.message.attachments) == 0:
             return await ctx.reply('Send a template in attachment')
 
         attachment = ctx.message.attachments[0]
@@ -124,52 +264,57 @@ class BingoGame(commands.Cog):
         if attachment.content_type != 'image/png':
             return await ctx.reply('Template must be PNG format')
 
-        filepath = helpers.download_template(attachment.url, ctx.channel.id, name)
-        with Image.open(f'templates/{filepath}') as img:
-            width, height = img.size
+        try:
+            data = await helpers.download_template(attachment)
+        except helpers.DownloadTooLargeError:
+            return await ctx.reply('Template file is too large!')
+        except (discord.HTTPException, asyncio.TimeoutError):
+            return await ctx.reply('Could not download the template, try again later!')
 
-        if not (width == 884 and height == 1036):
+        if helpers.png_size(data) != (884, 1036):
             return await ctx.reply('Template have not valid size (884 x 1036px)')
 
-        with Session(self.engine) as session:
-            template = model.Template(
-                name=name,
-                channel_id=ctx.channel.id,
-                filepath=filepath
-            )
+        try:
+            filepath = await helpers.save_template(data)
+        except (UnidentifiedImageError, OSError):
+            return await ctx.reply('Template is not a valid PNG file')
 
-            session.add_all([template])
-            session.commit()
+        await self.repository.add_template(ctx.channel.id, name, filepath)
+        self.catalog.invalidate_template(ctx.channel.id, name)
 
         return await ctx.reply('New template has been uploaded!')
 
 
     @commands.command('statistics')
     async def statistics(self, ctx: commands.Context):
-        with Session(self.engine) as session:
-            query = session.query(
-                model.Winner.user_id,
-                func.sum(model.Winner.points).label('total_points')
-            ).filter(
-                model.Winner.channel_id == ctx.channel.id
-            ).group_by(
-                model.Winner.user_id
-            ).order_by(
-                desc('total_points')
-            )
-
-            results = query.all()
+        results = await self.leaderboard.top(ctx.channel.id, TOP_PLAYERS)
 
         if not results:
             return await ctx.reply('Not one game has been played on this channel yet')
 
-        message = '**Top 10** bingo players:\n'
+        members = {user_id: ctx.guild.get_member(user_id) for user_id, _ in results}
+        missing = [user_id for user_id, member in members.items() if member is None]
+        if missing:
+            try:
+                for member in await ctx.guild.query_members(user_ids=missing, limit=len(missing)):
+                    members[member.id] = member
+            except asyncio.TimeoutError:
+                pass
+
+        message = f'**Top {TOP_PLAYERS}** bingo players:\n'
         for user_id, total_points in results:
-            member = await ctx.guild.fetch_member(user_id)
-            message += f'- {member.display_name}: {total_points}\n'
+            member = members.get(user_id)
+            name = member.display_name if member else f'Unknown player ({user_id})'
+            message += f'- {name}: {total_points}\n'
 
         return await ctx.reply(message)
 
+    @commands.command('metrics')
+    @commands.has_role('Administracja')
+    async def show_metrics(self, ctx: commands.Context):
+        for chunk in helpers.chunk_lines(metrics.REGISTRY.summary() or ['No metrics yet'], 1990):
+            await ctx.reply(f'```\n{chunk}\n```')
+
     @commands.command('test_notification')
     @commands.has_role('Administracja')
     async def test_notification(self, ctx: commands.Context):
@@ -179,10 +324,7 @@ class BingoGame(commands.Cog):
             'place': 1,
         }
 
-        self.redis_client.publish(
-            ctx.channel.id,
-            json.dumps(event)
-        )
+        await self.notifier.publish(ctx.channel.id, [event])
 
         return await ctx.reply('Test notification has been sent!')
 
@@ -190,45 +332,37 @@ class BingoGame(commands.Cog):
     @commands.command('start')
     @commands.has_role('Administracja')
     async def start_game(self, ctx: commands.Context, template_name: str, tileset_name: str):
-        if ctx.channel.id in self.sessions:
+        if ctx.channel.id in self.sessions or \
+                not await self.ownership.claim(ctx.channel.id):
             return await ctx.reply(i18n.t(f'{str(ctx.channel.id)}.game_already_exists_on_the_channel',
                                           default='Game already exists!'))
 
-        with Session(self.engine) as session:
-            query = select(model.TileSet)\
-                .where(model.TileSet.channel_id == ctx.channel.id)\
-                .where(model.TileSet.name == tileset_name)\
-                .limit(1)
-
-            try:
-                tiles_set = session.execute(query).one()[0]
-            except (NoResultFound, MultipleResultsFound, IndexError):
+        # The lease is only kept once the game exists.
+        try:
+            tiles_set = await self.catalog.get_tileset(ctx.channel.id, tileset_name)
+            if tiles_set is None:
                 return await ctx.reply(i18n.t(f'{str(ctx.channel.id)}.fields_file_not_exist',
-                                            default='Fields file doesn’t exist!'))
-
-            field_titles = [{'name': tile.name,
-                             'secret': tile.secret} for tile in tiles_set.tiles]
-
-        with Session(self.engine) as session:
-            query = select(model.Template)\
-                .where(model.Template.channel_id == ctx.channel.id)\
-                .where(model.Template.name == template_name)\
-                .limit(1)
+                                              default='Fields file doesn’t exist!'))
 
-            try:
-                template = session.execute(query).one()[0]
-            except (NoResultFound, MultipleResultsFound, IndexError):
+            template_filepath = await self.catalog.get_template(ctx.channel.id, template_name)
+            if template_filepath is None:
                 return await ctx.reply(i18n.t(f'{str(ctx.channel.id)}.template_file_not_exist',
-                                                        default='Template file doesn’t exist'))
+                                              default='Template file doesn’t exist'))
 
-        try:
-            self.sessions[ctx.channel.id] = BingoSession(
-                template_name=template.filepath,
-                fields=field_titles,
-                tiles_set_id=tiles_set.id,
-            )
-        except TemplateNotFoundError:
-            return await ctx.reply("Unexcepted error: Template don't exists in a filesystem")
+            try:
+                self.sessions[ctx.channel.id] = BingoSession(
+                    template_name=template_filepath,
+                    fields=tiles_set.fields(),
+                    tiles_set_id=tiles_set.id,
+                )
+            except TemplateNotFoundError:
+                return await ctx.reply("Unexcepted error: Template don't exists in a filesystem")
+        finally:
+            if ctx.channel.id not in self.sessions:
+                await self.ownership.release(ctx.channel.id)
+
+        await self.store.save_session(ctx.channel.id, self.sessions[ctx.channel.id],
+                                      guild_id=ctx.guild.id if ctx.guild else None)
 
         return await ctx.send(i18n.t(f'{str(ctx.channel.id)}.game_stared',
                                      default='Bingo game has started!'))
@@ -246,52 +380,54 @@ class BingoGame(commands.Cog):
         if interaction.user not in session.players:
             discord_user = interaction.user
             player = session.add_player(discord_user)
+            await self.store.append_join(interaction.channel.id, player)
 
-            file = render_to_io(
-                player.render()
-            )
+            board = await self.renderer.render(player.render_job(self.board_encoding))
 
             await discord_user.send(i18n.t(f'{str(interaction.channel.id)}.added_to_game_session_on_dm',
                                     default='Do you have a bingo on your board? '
                                             'Type the /bingo command on the game sessions channel!'),
-                                    file=discord.File(file, filename="bingo.png"))
+                                    file=board_to_file(board))
 
             player_count = len(self.sessions[interaction.channel.id].players) - 1
-            return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.added_to_game_session_on_channel',
-                                                    player_count=player_count,
-                                                    default=('Psst! A board with fields was sent to your Direct Messages!\n'
-                                                             f'Along with you, **{player_count} other players are playing!**')))
-
-        else:
-            player = session.players[interaction.user]
-            if player in session.winners:
-                return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.player_already_won_bingo',
-                                                        default="You're already on the podium!"))
-
-            won = player.check()
-            if not won:
-                return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.player_has_not_bingo',
-                                                        default="You don't have bingo on your board!"))
+            await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.added_to_game_session_on_channel',
+                                             player_count=player_count,
+                                             default=('Psst! A board with fields was sent to your Direct Messages!\n'
+                                                      f'Along with you, **{player_count} other players are playing!**')))
 
-        event = {
-            'avatar': None,
-            'winner': player.user.display_name,
-            'place': player.victory_place,
-        }
+            # Joining after the marks can complete a line straight away.
+            if player.won:
+                await self.announce_winners(interaction.channel, [player])
 
-        self.redis_client.publish(
-            interaction.channel.id,
-            json.dumps(event)
-        )
+            return
 
-        file = render_to_io(
-            player.render()
-        )
+        player = session.players[interaction.user]
+        if player.won:
+            return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.player_already_won_bingo',
+                                                    default="You're already on the podium!"))
+
+        return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.player_has_not_bingo',
+                                                default="You don't have bingo on your board!"))
+
+    async def announce_winners(self, channel: discord.abc.Messageable, winners):
+        await self.notifier.publish(channel.id, [winner_event(player) for player in winners])
+
+        announcements = []
+        for player in winners:
+            announcement = i18n.t(f'{str(channel.id)}.player_win_bingo',
+                                  username=player.user.name, place=player.victory_place,
+                                  default=f"{player.user.name} wins {player.victory_place} place!")
+            announcements.append(announcement)
+
+            self.dispatcher.submit(
+                (channel.id, player.user.id),
+                player.user,
+                announcement,
+                functools.partial(self.render_board_file, player),
+            )
 
-        return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.player_win_bingo',
-                                                        username=player.user.name, place=player.victory_place,
-                                                        default=f"{player.user.name} wins ${player.victory_place} place!"),
-                                                file=discord.File(file, filename=f"bingo.png"))
+        for message in helpers.chunk_lines(announcements):
+            await channel.send(message)
 
     @app_commands.command(name='mark', description='Mark the tile in bingo!')
     @app_commands.describe(field_name='Name of tile what you want to mark')
@@ -304,14 +440,9 @@ class BingoGame(commands.Cog):
 
         await interaction.response.defer()
 
-        selected_field = None
-        for field in session.fields:
-            if field.title == field_name:
-                selected_field = field
-                break
-
+        selected_field = session.field_index.get(field_name)
         if not selected_field:
-            return await interaction.response.send_message(
+            return await interaction.followup.send(
                 i18n.t(f'{str(interaction.channel.id)}.field_name_not_exists',
                        default="Field with this name not exists!"), ephemeral=True)
 
@@ -320,27 +451,31 @@ class BingoGame(commands.Cog):
                                                           field_title=selected_field.title,
                                                           default=f'Marked field: {selected_field.title}'))
 
-        selected_field.mark()
+        winners = selected_field.mark()
+        selected_field.is_sent = True
+        await self.store.append_mark(interaction.channel.id, selected_field)
+
+        marked_message = i18n.t(f'{str(interaction.channel.id)}.field_is_marked',
+                                field_title=selected_field.title,
+                                default=f'Marked field: {selected_field.title}')
 
-        for player in selected_field.players:
+        # Boards are rendered when the DM goes out, so a player who gets
+        # several marks before delivery receives only the latest board.
+        for player in session.players_on(selected_field):
             if player.won:
                 continue
 
-            file = render_to_io(
-                player.render()
+            self.dispatcher.submit(
+                (interaction.channel.id, player.user.id),
+                player.user,
+                marked_message,
+                functools.partial(self.render_board_file, player),
             )
 
-            asyncio.get_event_loop().create_task(
-                player.user.send(i18n.t(f'{str(interaction.channel.id)}.field_is_marked',
-                                        field_title=selected_field.title,
-                                        default=f'Marked field: {selected_field.title}'),
-                                 file=discord.File(file, filename=f"bingo.png")))
+        await interaction.followup.send(marked_message)
 
-        selected_field.is_sent = True
-
-        return await interaction.followup.send(i18n.t(f'{str(interaction.channel.id)}.field_is_marked',
-                                                        field_title=selected_field.title,
-                                                        default=f'Marked field: {selected_field.title}'))
+        if winners:
+            await self.announce_winners(interaction.channel, winners)
 
 
     @mark.autocomplete('field_name')
@@ -352,25 +487,22 @@ class BingoGame(commands.Cog):
         if not 'Administracja' in [role.name for role in ctx.user.roles]:
             return []
 
-        fields = self.sessions[ctx.channel.id].fields
-        field_names = []
-        for field in fields:
-            if current.lower() in field.title.lower() and not field.marked:
-                field_names.append(field.title)
+        if ctx.channel.id not in self.sessions:
+            return []
 
-        field_names = field_names[:25]
         return [
-            app_commands.Choice(name=field_name, value=field_name)
-            for field_name in field_names if current.lower() in field_name.lower()
+            app_commands.Choice(name=field.title, value=field.title)
+            for field in self.sessions[ctx.channel.id].field_index.search(current)
         ]
 
     @commands.command('stop')
     @commands.has_role('Administracja')
     async def stop_game(self, ctx: commands.Context):
-        if ctx.channel.id not in self.sessions:
+        # Dropped first, so a second /stop can not count the game twice.
+        game_session = self.sessions.pop(ctx.channel.id, None)
+        if game_session is None:
             return
 
-        game_session = self.sessions[ctx.channel.id]
         winners = game_session.winners
 
         message = i18n.t(f'{str(ctx.channel.id)}.winners_announcement',
@@ -381,38 +513,17 @@ class BingoGame(commands.Cog):
 
         await ctx.send(message)
 
-        with Session(self.engine) as session:
-            winners = [
-                model.Winner(
-                    channel_id=ctx.channel.id,
-                    user_id=winner.user.id,
-                    points=1
-                ) for winner in winners
-            ]
-            session.add_all(winners)
-            session.commit()
-
-        with Session(self.engine) as session:
-            session.query(model.TileSet).filter_by(id=game_session.tiles_set_id)\
-                                        .update({model.TileSet.games_played: model.TileSet.games_played + 1})
-            session.commit()
-
-        with Session(self.engine) as session:
-            marked_tiles = [field.title for field in game_session.fields if field.marked]
-            session.query(model.Tile).filter_by(tile_set_id=game_session.tiles_set_id)\
-                                     .filter(model.Tile.name.in_(marked_tiles))\
-                                     .update({model.Tile.counter: model.Tile.counter + 1},
-                                             synchronize_session=False)
-            session.commit()
-
-        message = 'Hall of Shame:\n'
-        for user, player in self.sessions[ctx.channel.id].players.items():
-            if not player.won and player.check(game_over=True):
-                message += f'- {user.display_name}\n'
-
-        await ctx.send(message)
+        await self.repository.finish_game(
+            ctx.channel.id,
+            game_session.tiles_set_id,
+            [winner.user.id for winner in winners],
+            [field.tile_id for field in game_session.fields
+             if field.marked and field.tile_id is not None],
+        )
+        await self.leaderboard.invalidate(ctx.channel.id)
 
-        del self.sessions[ctx.channel.id]
+        await self.store.delete_session(ctx.channel.id)
+        await self.ownership.release(ctx.channel.id)
  
 
 def setup(bot):
@@ -0,0 +1,54 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from database.repository import Repository
+
+
+class TileSetEntry(NamedTuple):
+    id: int
+    tiles: Tuple[Tuple[int, str, bool], ...]
+
+    def fields(self) -> List[dict]:
+        return [{'id': tile_id, 'name': name, 'secret': secret}
+                for tile_id, name, secret in self.tiles]
+
+
+class Catalog:
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+        # Keyed by (channel_id, name), filled on the first /start that needs them.
+        self.tile_sets: Dict[Tuple[int, str], TileSetEntry] = {}
+        self.templates: Dict[Tuple[int, str], str] = {}
+
+    async def get_tileset(self, channel_id: int, name: str) -> Optional[TileSetEntry]:
+        entry = self.tile_sets.get((channel_id, name))
+        if entry is not None:
+            return entry
+
+        loaded = await self.repository.get_tileset(channel_id, name)
+        if loaded is None:
+            return None
+
+        tile_set_id, tiles = loaded
+        entry = TileSetEntry(tile_set_id, tuple((tile['id'], tile['name'], tile['secret'])
+                                                for tile in tiles))
+        self.tile_sets[(channel_id, name)] = entry
+
+        return entry
+
+    async def get_template(self, channel_id: int, name: str) -> Optional[str]:
+        filepath = self.templates.get((channel_id, name))
+        if filepath is not None:
+            return filepath
+
+        filepath = await self.repository.get_template(channel_id, name)
+        if filepath is not None:
+            self.templates[(channel_id, name)] = filepath
+
+        return filepath
+
+    def invalidate_tileset(self, channel_id: int, name: str):
+        self.tile_sets.pop((channel_id, name), None)
+
+    def invalidate_template(self, channel_id: int, name: str):
+        self.templates.pop((channel_id, name), None)
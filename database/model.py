@@ -1,6 +1,6 @@
 from typing import List
 from sqlalchemy import String, BigInteger
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -13,6 +13,9 @@ class Base(DeclarativeBase):
 
 class TileSet(Base):
     __tablename__ = 'tile_set'
+    __table_args__ = (
+        Index('ix_tile_set_channel_id_name', 'channel_id', 'name'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     channel_id: Mapped[int] = mapped_column(BigInteger)
@@ -35,7 +38,7 @@ class Tile(Base):
     counter: Mapped[int] = mapped_column(default=0)
     secret: Mapped[bool] = mapped_column(default=False)
 
-    tile_set_id: Mapped[int] = mapped_column(ForeignKey("tile_set.id"))
+    tile_set_id: Mapped[int] = mapped_column(ForeignKey("tile_set.id"), index=True)
     tile_set: Mapped['TileSet'] = relationship(back_populates='tiles')
 
     def __repr__(self) -> str:
@@ -44,6 +47,9 @@ class Tile(Base):
 
 class Template(Base):
     __tablename__ = 'template'
+    __table_args__ = (
+        Index('ix_template_channel_id_name', 'channel_id', 'name'),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     channel_id: Mapped[int] = mapped_column(BigInteger)
@@ -61,3 +67,17 @@ class Winner(Base):
     channel_id: Mapped[int] = mapped_column(BigInteger)
     user_id: Mapped[int] = mapped_column(BigInteger)
     points: Mapped[int] = mapped_column(default=0)
+
+
+class PlayerPoints(Base):
+    __tablename__ = 'player_points'
+    __table_args__ = (
+        Index('ix_player_points_channel_id_points', 'channel_id', 'points'),
+    )
+
+    channel_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    points: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return f'PlayerPoints(channel_id={self.channel_id!r}, user_id={self.user_id!r}, points={self.points!r})'
@@ -0,0 +1,193 @@
+import asyncio
+import functools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from os import environ
+from typing import List, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import select, update
+from sqlalchemy import exists, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database import model
+from utils import metrics
+
+
+def create_engine(uri: str):
+    url = sqlalchemy.engine.make_url(uri)
+
+    if url.get_backend_name() == 'sqlite':
+        # Tests and local runs: one shared in-memory database across threads.
+        if url.database in (None, '', ':memory:'):
+            return sqlalchemy.create_engine(url, poolclass=StaticPool,
+                                            connect_args={'check_same_thread': False})
+        return sqlalchemy.create_engine(url, connect_args={'check_same_thread': False})
+
+    return sqlalchemy.create_engine(
+        url,
+        pool_size=int(environ.get('DB_POOL_SIZE', 10)),
+        max_overflow=int(environ.get('DB_MAX_OVERFLOW', 10)),
+        pool_timeout=float(environ.get('DB_POOL_TIMEOUT', 10)),
+        pool_recycle=1800,
+        pool_pre_ping=True,
+    )
+
+
+def upsert(engine, table):
+    if engine.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+
+    return sqlite.insert(table)
+
+
+class Repository:
+    def __init__(self, engine, workers: int = None):
+        self.engine = engine
+
+        # Never more threads than connections, extra ones would only wait on the pool.
+        pool_size = getattr(engine.pool, 'size', lambda: 5)()
+        self.executor = ThreadPoolExecutor(max_workers=workers or pool_size,
+                                           thread_name_prefix='bingo-db')
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        with metrics.DB_QUERY_SECONDS.time(query=function.__name__.lstrip('_')):
+            return await loop.run_in_executor(self.executor, functools.partial(function, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def _tileset_exists(self, channel_id: int, name: str) -> bool:
+        with Session(self.engine) as session:
+            return session.query(exists().where(and_(
+                model.TileSet.name == name,
+                model.TileSet.channel_id == channel_id
+            ))).scalar()
+
+    async def tileset_exists(self, channel_id: int, name: str) -> bool:
+        return await self._run(self._tileset_exists, channel_id, name)
+
+    def _add_tileset(self, channel_id: int, name: str, tiles: List[dict]):
+        with Session(self.engine) as session:
+            tile_set = model.TileSet(
+                name=name,
+                channel_id=channel_id,
+                tiles=[
+                    model.Tile(
+                        name=tile['name'],
+                        secret=tile['secret']
+                    ) for tile in tiles
+                ]
+            )
+
+            session.add_all([tile_set])
+            session.commit()
+
+    async def add_tileset(self, channel_id: int, name: str, tiles: List[dict]):
+        return await self._run(self._add_tileset, channel_id, name, tiles)
+
+    def _template_exists(self, channel_id: int, name: str) -> bool:
+        with Session(self.engine) as session:
+            return session.query(exists().where(and_(
+                model.Template.name == name,
+                model.Template.channel_id == channel_id
+            ))).scalar()
+
+    async def template_exists(self, channel_id: int, name: str) -> bool:
+        return await self._run(self._template_exists, channel_id, name)
+
+    def _add_template(self, channel_id: int, name: str, filepath: str):
+        with Session(self.engine) as session:
+            template = model.Template(
+                name=name,
+                channel_id=channel_id,
+                filepath=filepath
+            )
+
+            session.add_all([template])
+            session.commit()
+
+    async def add_template(self, channel_id: int, name: str, filepath: str):
+        return await self._run(self._add_template, channel_id, name, filepath)
+
+    def _get_tileset(self, channel_id: int, name: str) -> Optional[Tuple[int, List[dict]]]:
+        with Session(self.engine) as session:
+            tile_set_id = session.execute(
+                select(model.TileSet.id)
+                .where(model.TileSet.channel_id == channel_id)
+                .where(model.TileSet.name == name)
+                .limit(1)
+            ).scalar()
+            if tile_set_id is None:
+                return None
+
+            tiles = session.execute(
+                select(model.Tile.id, model.Tile.name, model.Tile.secret)
+                .where(model.Tile.tile_set_id == tile_set_id)
+                .order_by(model.Tile.id)
+            ).all()
+
+            return tile_set_id, [{'id': tile_id,
+                                  'name': tile_name,
+                                  'secret': secret} for tile_id, tile_name, secret in tiles]
+
+    async def get_tileset(self, channel_id: int, name: str) -> Optional[Tuple[int, List[dict]]]:
+        return await self._run(self._get_tileset, channel_id, name)
+
+    def _get_template(self, channel_id: int, name: str) -> Optional[str]:
+        with Session(self.engine) as session:
+            query = select(model.Template.filepath)\
+                .where(model.Template.channel_id == channel_id)\
+                .where(model.Template.name == name)\
+                .limit(1)
+
+            return session.execute(query).scalar()
+
+    async def get_template(self, channel_id: int, name: str) -> Optional[str]:
+        return await self._run(self._get_template, channel_id, name)
+
+    def _leaderboard(self, channel_id: int) -> List[Tuple[int, int]]:
+        with Session(self.engine) as session:
+            query = select(model.PlayerPoints.user_id, model.PlayerPoints.points)\
+                .where(model.PlayerPoints.channel_id == channel_id)\
+                .order_by(model.PlayerPoints.points.desc())
+
+            return [tuple(row) for row in session.execute(query).all()]
+
+    async def leaderboard(self, channel_id: int) -> List[Tuple[int, int]]:
+        return await self._run(self._leaderboard, channel_id)
+
+    def _finish_game(self, channel_id: int, tiles_set_id: int,
+                     winner_ids: List[int], marked_tile_ids: List[int]):
+        with Session(self.engine) as session, session.begin():
+            if winner_ids:
+                # One row per (channel, user), a statement may touch each row only once.
+                statement = upsert(self.engine, model.PlayerPoints).values([
+                    {'channel_id': channel_id, 'user_id': user_id, 'points': points}
+                    for user_id, points in Counter(winner_ids).items()
+                ])
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=[model.PlayerPoints.channel_id, model.PlayerPoints.user_id],
+                    set_={'points': model.PlayerPoints.points + statement.excluded.points},
+                ))
+
+            session.execute(
+                update(model.TileSet)
+                .where(model.TileSet.id == tiles_set_id)
+                .values(games_played=model.TileSet.games_played + 1)
+            )
+
+            if marked_tile_ids:
+                session.execute(
+                    update(model.Tile)
+                    .where(model.Tile.id.in_(marked_tile_ids))
+                    .values(counter=model.Tile.counter + 1)
+                )
+
+    async def finish_game(self, channel_id: int, tiles_set_id: int,
+                          winner_ids: List[int], marked_tile_ids: List[int]):
+        return await self._run(self._finish_game, channel_id, tiles_set_id,
+                               winner_ids, marked_tile_ids)
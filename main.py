@@ -5,12 +5,22 @@ from dotenv import load_dotenv
 from os import getenv
 
 from cogs.bingo_game import BingoGame
+from utils.sharding import shard_config
 
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix='/', intents=intents)
+load_dotenv()
+
+# Each process runs the shards listed in SHARD_IDS out of SHARD_COUNT,
+# games live in Redis so any process can pick up a channel's state.
+shard_ids, shard_count = shard_config()
+if shard_count:
+    bot = commands.AutoShardedBot(command_prefix='/', intents=intents,
+                                  shard_ids=shard_ids, shard_count=shard_count)
+else:
+    bot = commands.Bot(command_prefix='/', intents=intents)
 
 
 @bot.event
@@ -19,5 +29,4 @@ async def on_ready():
     await bot.change_presence(activity=discord.Game(name="Bingo!"))
     print(f'Logged in as {bot.user} (ID: {bot.user.id})')
 
-load_dotenv()
 bot.run(getenv("DISCORD_TOKEN"))
@@ -0,0 +1,65 @@
+"""initial schema
+
+Revision ID: 1a7c3e5b9d20
+Revises: 
+Create Date: 2026-10-18 11:00:00.000000
+
+Databases created before migrations existed already have these tables,
+mark them with `alembic stamp 1a7c3e5b9d20` before upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7c3e5b9d20'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tile_set',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('channel_id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'tile',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('counter', sa.Integer(), nullable=False),
+        sa.Column('secret', sa.Boolean(), nullable=False),
+        sa.Column('tile_set_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tile_set_id'], ['tile_set.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'template',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('channel_id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('filepath', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'winner',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('channel_id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('winner')
+    op.drop_table('template')
+    op.drop_table('tile')
+    op.drop_table('tile_set')
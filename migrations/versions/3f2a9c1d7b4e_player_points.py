@@ -0,0 +1,42 @@
+"""player points
+
+Revision ID: 3f2a9c1d7b4e
+Revises: 1a7c3e5b9d20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7b4e'
+down_revision: Union[str, None] = '1a7c3e5b9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'player_points',
+        sa.Column('channel_id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('channel_id', 'user_id'),
+    )
+    op.create_index('ix_player_points_channel_id_points', 'player_points',
+                    ['channel_id', 'points'], unique=False)
+
+    # Carry over the totals kept so far as one winner row per win.
+    op.execute(
+        'INSERT INTO player_points (channel_id, user_id, points) '
+        'SELECT channel_id, user_id, SUM(points) FROM winner '
+        'GROUP BY channel_id, user_id'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_player_points_channel_id_points', table_name='player_points')
+    op.drop_table('player_points')
@@ -0,0 +1,29 @@
+"""catalog indexes
+
+Revision ID: 8b6e0d4f2c1a
+Revises: 3f2a9c1d7b4e
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b6e0d4f2c1a'
+down_revision: Union[str, None] = '3f2a9c1d7b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tile_set_channel_id_name', 'tile_set', ['channel_id', 'name'], unique=False)
+    op.create_index('ix_template_channel_id_name', 'template', ['channel_id', 'name'], unique=False)
+    op.create_index('ix_tile_tile_set_id', 'tile', ['tile_set_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tile_tile_set_id', table_name='tile')
+    op.drop_index('ix_template_channel_id_name', table_name='template')
+    op.drop_index('ix_tile_set_channel_id_name', table_name='tile_set')
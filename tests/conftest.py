@@ -0,0 +1,18 @@
+from database import model
+from database.repository import Repository, create_engine
+
+import pytest
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    model.Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def repository(engine):
+    repository = Repository(engine)
+    yield repository
+    repository.shutdown()
@@ -1,4 +1,11 @@
+import tracemalloc
+from array import array
+
+from benchmarks.fakes import FakeUser
 from bingo.main import Field, Player, Session
+from bingo.engine import WINNING_LINES
+from bingo.helpers import render
+from PIL import ImageChops
 
 import pytest
 
@@ -6,7 +13,7 @@ import pytest
 def get_fields(fields_name):
     with open(f"tests/test_bingo/{fields_name}", "r") as f:
         fields = f.read().splitlines()
-        return fields
+        return [{'name': field, 'secret': False} for field in fields]
 
 
 @pytest.mark.parametrize(
@@ -14,29 +21,122 @@ def get_fields(fields_name):
 )
 def test_get_session(fields):
     fields_lines = get_fields(fields)
-    Session("template.png", fields_lines)
+    Session("template.png", fields_lines, tiles_set_id=1)
+
+
+@pytest.fixture
+def user():
+    return FakeUser(1)
 
 
 @pytest.fixture
 def session():
-    return Session("template.png", get_fields("fields.txt"))
+    return Session("template.png", get_fields("fields.txt"), tiles_set_id=1)
 
 
-def test_add_player(session):
-    session.add_player("player")
+def test_add_player(session, user):
+    session.add_player(user)
 
 
-def test_mark_field(session):
-    session.add_player("player")
+def test_mark_field(session, user):
+    session.add_player(user)
 
     for field in session.fields:
         field.mark()
         assert field.marked
 
-    assert session.players["player"].bingo == {
-            "rows": [5, 5, 5, 5, 5],
-            "cols": [5, 5, 5, 5, 5],
-            "diagonal": [5, 5],
-        }
+    assert session.players[user].state == (1 << 25) - 1
+
+    assert session.players[user].check()
+
+
+def test_board_is_rendered_from_current_marks(session, user):
+    player = session.add_player(user)
+    board = player.render()
+
+    player.board[0].mark()
+
+    marked_board = player.render()
+    assert marked_board is not board
+    assert ImageChops.difference(board, marked_board).getbbox() is not None
+    assert player.render_job().marked_mask == 0b1
+
+
+def test_player_state_is_compact(session, user):
+    player = session.add_player(user)
+
+    assert not hasattr(player, '__dict__')
+    assert not hasattr(session.fields[0], '__dict__')
+    assert [field.index for field in player.board] == list(player.cells)
+
+
+def test_players_on_field(session, user):
+    player = session.add_player(user)
+    other = session.add_player(FakeUser(2))
+
+    assert session.players_on(player.board[0]) == \
+        [p for p in (player, other) if player.board[0].index in p.cells]
+
+
+def test_winning_lines():
+    assert len(WINNING_LINES) == 12
+    assert all(bin(line).count("1") == 5 for line in WINNING_LINES)
+
+
+@pytest.mark.parametrize(
+    "indexes, won", [
+        ([0, 1, 2, 3, 4], True),
+        ([10, 11, 12, 13], True),
+        ([2, 7, 16, 21], True),
+        ([0, 6, 17, 23], True),
+        ([4, 8, 15, 19], True),
+        ([0, 1, 2, 3], False),
+        ([0, 6, 17], False),
+    ]
+)
+def test_check_lines(session, user, indexes, won):
+    player = session.add_player(user)
+    for index in indexes:
+        player.board[index].mark()
+
+    assert player.check() == won
+
+
+def test_fields_are_rendered_lazily(user):
+    render.tile_cache.clear()
+    session = Session("template.png", get_fields("fields.txt"), tiles_set_id=1)
+    assert len(render.tile_cache) == 0
+
+    player = session.add_player(user)
+    player.render()
+    assert len(render.tile_cache) == 24
+
+
+def test_boards_follow_the_session_seed(user):
+    fields = get_fields("fields.txt")
+    first = Session("template.png", fields, tiles_set_id=1, seed=5)
+    second = Session("template.png", fields, tiles_set_id=1, seed=5)
+
+    player = first.add_player(user)
+    assert second.add_player(user).cells == player.cells
+
+    # Boards outside the current batch are rebuilt from their number alone.
+    first.board_batch = array('I')
+    assert first.board_cells(player.number) == player.cells
+
+
+def test_player_memory_is_a_few_hundred_bytes():
+    fields = [{'name': f'Tile {n}', 'secret': False} for n in range(300)]
+    session = Session("template.png", fields, tiles_set_id=1)
+    users = [FakeUser(user_id) for user_id in range(2000)]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for user in users:
+            session.add_player(user)
+        per_player = (tracemalloc.get_traced_memory()[0] - before) / len(users)
+    finally:
+        tracemalloc.stop()
 
-    assert session.players["player"].check()
+    assert per_player < 600
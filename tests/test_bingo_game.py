@@ -0,0 +1,136 @@
+import asyncio
+import types
+
+import discord
+
+from benchmarks.fakes import FakeBot, FakeChannel, FakeContext, FakeGuild, FakeRedis, FakeUser
+from bingo.main import Session
+from cogs.bingo_game import BingoGame, MissingUser
+
+import pytest
+
+
+@pytest.fixture
+def cog(monkeypatch, engine):
+    monkeypatch.setenv('RENDER_EXECUTOR', 'thread')
+
+    cog = BingoGame(FakeBot([FakeUser(1)]), engine=engine, redis_client=FakeRedis())
+    yield cog
+    cog.renderer.shutdown()
+    cog.repository.shutdown()
+
+
+def tiles():
+    return [{'id': n, 'name': f'Tile {n}', 'secret': False} for n in range(30)]
+
+
+def test_restore_keeps_players_that_cannot_be_fetched(cog):
+    session = Session("template.png", tiles(), tiles_set_id=1)
+
+    async def scenario():
+        await cog.store.save_session(42, session)
+        for user in (FakeUser(1), FakeUser(2)):
+            await cog.store.append_join(42, session.add_player(user))
+
+        await cog.restore_session(42)
+
+    asyncio.run(scenario())
+
+    restored = cog.sessions[42]
+    users = {player.user.id: player.user for player in restored.players.values()}
+    assert users[1] is cog.bot.users[1]
+    assert isinstance(users[2], MissingUser)
+
+
+class DiscordUser(FakeUser):
+    def __hash__(self):
+        return self.id >> 22
+
+
+def test_missing_user_matches_a_returning_account():
+    players = {MissingUser(2): 'player'}
+
+    assert players[DiscordUser(2)] == 'player'
+
+
+def test_restore_is_retried_after_transient_errors(cog, monkeypatch):
+    session = Session("template.png", tiles(), tiles_set_id=1)
+    fetch_user = cog.bot.fetch_user
+
+    async def unavailable(user_id):
+        raise discord.HTTPException(types.SimpleNamespace(status=503, reason='Unavailable'), 'error')
+
+    async def scenario():
+        await cog.store.save_session(42, session)
+        await cog.store.append_join(42, session.add_player(FakeUser(1)))
+        cog.bot.users.clear()
+
+        monkeypatch.setattr(cog.bot, 'fetch_user', unavailable)
+        await cog.restore_session(42)
+        assert 42 not in cog.sessions
+        assert 42 in cog.pending_restores
+
+        cog.bot.users[1] = FakeUser(1)
+        monkeypatch.setattr(cog.bot, 'fetch_user', fetch_user)
+        await cog.renew_ownership()
+
+    asyncio.run(scenario())
+
+    assert 42 not in cog.pending_restores
+    assert [player.user for player in cog.sessions[42].players.values()] == [FakeUser(1)]
+
+
+def test_keep_ownership_survives_errors(cog, monkeypatch):
+    async def renew(channel_ids):
+        raise ConnectionError('redis is down')
+
+    monkeypatch.setattr(cog.ownership, 'renew', renew)
+
+    asyncio.run(cog.keep_ownership.coro(cog))
+
+
+def test_failed_start_releases_the_lease(cog):
+    channel = FakeChannel(42)
+    context = FakeContext(channel, FakeGuild(7, []), FakeUser(1, roles=['Administracja']))
+
+    async def scenario():
+        await cog.start_game.callback(cog, context, 'default', 'missing')
+        return await cog.redis_client.get('bingo:owner:42')
+
+    assert asyncio.run(scenario()) is None
+    assert 42 not in cog.sessions
+    assert context.replies == ['Fields file doesn’t exist!']
+
+
+@pytest.mark.parametrize(
+    "shard_ids, shard_id, owned", [
+        (None, None, [True, True, True]),
+        ([1], None, [False, True, False]),
+        (None, 2, [False, False, True]),
+    ]
+)
+def test_owns_guild(cog, shard_ids, shard_id, owned):
+    cog.bot.shard_count = 3
+    cog.bot.shard_ids = shard_ids
+    cog.bot.shard_id = shard_id
+
+    # Guild n << 22 lands on shard n % 3.
+    assert [cog.owns_guild(n << 22) for n in range(3)] == owned
+
+
+def test_repeated_stop_counts_the_game_once(cog):
+    session = Session("template.png", tiles(), tiles_set_id=1)
+    session.add_player(FakeUser(1))
+    for field in session.fields:
+        field.mark()
+    cog.sessions[42] = session
+
+    context = FakeContext(FakeChannel(42), FakeGuild(7, []), FakeUser(1, roles=['Administracja']))
+
+    async def scenario():
+        await cog.stop_game.callback(cog, context)
+        await cog.stop_game.callback(cog, context)
+        return await cog.leaderboard.top(42)
+
+    assert asyncio.run(scenario()) == [(1, 1)]
+    assert 42 not in cog.sessions
@@ -0,0 +1,63 @@
+import asyncio
+
+from database.catalog import Catalog
+from database.repository import Repository
+
+import pytest
+
+
+class CountingRepository(Repository):
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.calls = 0
+
+    async def _run(self, function, *args):
+        self.calls += 1
+        return await super()._run(function, *args)
+
+
+@pytest.fixture
+def repository(engine):
+    repository = CountingRepository(engine)
+    yield repository
+    repository.shutdown()
+
+
+def test_repeated_starts_hit_the_cache(repository):
+    catalog = Catalog(repository)
+    tiles = [{'name': f'Tile {n}', 'secret': n == 1} for n in range(24)]
+
+    async def scenario():
+        await repository.add_tileset(1, 'set', tiles)
+        await repository.add_template(1, 'default', '1_default.png')
+        repository.calls = 0
+
+        for _ in range(3):
+            entry = await catalog.get_tileset(1, 'set')
+            filepath = await catalog.get_template(1, 'default')
+
+        return entry, filepath
+
+    entry, filepath = asyncio.run(scenario())
+
+    assert repository.calls == 2
+    assert filepath == '1_default.png'
+    assert isinstance(entry.tiles, tuple)
+    assert [field['name'] for field in entry.fields()] == [tile['name'] for tile in tiles]
+
+
+def test_invalidation(repository):
+    catalog = Catalog(repository)
+
+    async def scenario():
+        assert await catalog.get_template(1, 'default') is None
+
+        await repository.add_template(1, 'default', 'first.png')
+        assert await catalog.get_template(1, 'default') == 'first.png'
+
+        catalog.invalidate_template(1, 'default')
+        catalog.invalidate_tileset(1, 'missing')
+        return await catalog.get_template(1, 'default')
+
+    assert asyncio.run(scenario()) == 'first.png'
+    assert (1, 'default') in catalog.templates
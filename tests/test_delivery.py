@@ -0,0 +1,66 @@
+import asyncio
+import types
+
+import discord
+from utils.delivery import DMDispatcher
+
+import pytest
+
+
+class FakeUser:
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.messages = []
+
+    async def send(self, content, file=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.messages.append((content, file))
+
+
+def http_error(error_class, status):
+    return error_class(types.SimpleNamespace(status=status, reason='error'), 'error')
+
+
+async def build_file():
+    return 'board'
+
+
+def run(dispatcher, deliveries):
+    async def scenario():
+        for key, user, content in deliveries:
+            dispatcher.submit(key, user, content, build_file)
+
+        dispatcher.start()
+        await dispatcher.join()
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+
+def test_undelivered_boards_are_coalesced():
+    user = FakeUser()
+    dispatcher = DMDispatcher(workers=2, rate=1000)
+    run(dispatcher, [(1, user, 'first'), (1, user, 'second'), (1, user, 'third')])
+
+    assert user.messages == [('third', 'board')]
+    assert dispatcher.metrics()['coalesced'] == 2
+    assert dispatcher.metrics()['sent'] == 1
+    assert dispatcher.metrics()['queue_depth'] == 0
+
+
+@pytest.mark.parametrize(
+    "error_class, status, delivered", [
+        (discord.HTTPException, 429, True),
+        (discord.HTTPException, 503, True),
+        (discord.HTTPException, 400, False),
+        (discord.Forbidden, 403, False),
+    ]
+)
+def test_retries_only_transient_errors(error_class, status, delivered):
+    user = FakeUser(errors=[http_error(error_class, status)])
+    dispatcher = DMDispatcher(workers=1, rate=1000, backoff=0)
+    run(dispatcher, [(1, user, 'board')])
+
+    assert bool(user.messages) == delivered
+    assert dispatcher.metrics()['failed'] == (0 if delivered else 1)
@@ -0,0 +1,48 @@
+import io
+
+from bingo.helpers import encoding, render
+from PIL import Image, ImageChops
+
+import pytest
+
+
+@pytest.fixture
+def board():
+    titles = tuple(f"Field {n}" for n in range(24))
+    return render.compose_job(render.RenderJob("template.png", titles, marked_mask=0b1001))
+
+
+@pytest.mark.parametrize(
+    "profile_name", list(encoding.PROFILES)
+)
+def test_profiles_produce_decodable_boards(profile_name, board):
+    encoded = encoding.encode(board, profile_name)
+
+    assert encoded.seconds >= 0
+    with Image.open(io.BytesIO(encoded.data)) as decoded:
+        assert decoded.size == board.size
+        assert decoded.format.lower() == encoded.extension
+
+
+@pytest.mark.parametrize(
+    "profile_name", ["png", "png-fast", "webp-lossless"]
+)
+def test_lossless_profiles(profile_name, board):
+    encoded = encoding.encode(board, profile_name)
+
+    with Image.open(io.BytesIO(encoded.data)) as decoded:
+        assert ImageChops.difference(decoded.convert('RGBA'), board).getbbox() is None
+
+
+def test_stats_are_recorded(board):
+    stats = encoding.EncodingStats()
+    stats.record('png', encoding.encode(board, 'png'))
+
+    summary = stats.summary()['png']
+    assert summary['count'] == 1
+    assert summary['average_bytes'] > 0
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        encoding.get_profile('jpeg')
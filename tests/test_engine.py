@@ -0,0 +1,47 @@
+from bingo.engine import BoardMatrix, CENTER_CELL, generate_boards, has_bingo
+
+import numpy as np
+
+
+def test_winners_are_found_in_join_order():
+    boards = BoardMatrix(fields_count=30, capacity=1)
+
+    # Every player shares the first row of fields, so the fifth mark completes it for all.
+    rows = [boards.add(list(range(24))) for _ in range(5)]
+    assert rows == [0, 1, 2, 3, 4]
+
+    for field_index in range(4):
+        assert len(boards.mark(field_index)) == 0
+
+    assert boards.mark(4).tolist() == rows
+    assert boards.mark(5).tolist() == []
+
+
+def test_only_completed_lines_win():
+    boards = BoardMatrix(fields_count=48)
+    first = boards.add(list(range(24)))
+    second = boards.add(list(range(24, 48)))
+
+    for field_index in (0, 5, 10, 14, 19):
+        assert boards.mark(field_index).tolist() == ([first] if field_index == 19 else [])
+
+    assert boards.state(second) == 1 << CENTER_CELL
+    assert not boards.won[second]
+
+
+def test_late_player_with_marked_line_has_won():
+    boards = BoardMatrix(fields_count=24)
+    row = boards.add(list(range(24)), marked_fields=[10, 11, 12, 13])
+
+    assert boards.won[row]
+    assert has_bingo(boards.state(row))
+    assert isinstance(boards.mark(0), np.ndarray)
+
+
+def test_boards_are_reproducible():
+    boards = generate_boards(seed=7, fields_count=100, first=10, count=5)
+
+    assert boards.shape == (5, 24)
+    assert all(len(set(board)) == 24 for board in boards.tolist())
+    assert (generate_boards(7, 100, 12)[0] == boards[2]).all()
+    assert not (generate_boards(8, 100, 12)[0] == boards[2]).all()
@@ -0,0 +1,34 @@
+import asyncio
+import io
+
+from bingo.helpers import render
+from bingo.helpers.executor import RenderExecutor
+from PIL import Image, ImageChops
+
+import pytest
+
+
+@pytest.fixture
+def job():
+    titles = tuple(f"Field {n}" for n in range(24))
+    return render.RenderJob("template.png", titles, secret_mask=0b11, marked_mask=0b101)
+
+
+@pytest.mark.parametrize(
+    "kind", ["thread", "process"]
+)
+def test_render_job_in_pool(kind, job):
+    executor = RenderExecutor(kind, workers=1)
+    try:
+        encoded = asyncio.run(executor.render(job))
+    finally:
+        executor.shutdown()
+
+    with Image.open(io.BytesIO(encoded.data)) as board:
+        assert board.size == render.templates.get(job.template_name).size
+        assert ImageChops.difference(board, render.compose_job(job)).getbbox() is None
+
+
+def test_unknown_executor_kind():
+    with pytest.raises(ValueError):
+        RenderExecutor("cluster")
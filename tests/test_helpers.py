@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+from utils import helpers
+
+import pytest
+
+
+def test_png_size():
+    with open("templates/template.png", "rb") as f:
+        data = f.read()
+
+    assert helpers.png_size(data) == (884, 1036)
+    assert helpers.png_size(data[:20]) is None
+    assert helpers.png_size(b"GIF89a" + data[6:]) is None
+
+
+def test_parse_tile():
+    assert helpers.parse_tile("$ Secret tile ") == {'secret': True, 'name': 'Secret tile'}
+    assert helpers.parse_tile("Plain tile") == {'secret': False, 'name': 'Plain tile'}
+
+
+def serve_and_download(body: bytes, **kwargs):
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(body)
+        return response
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/raw/tiles', handler)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        try:
+            return await helpers.download_tileset(f'http://127.0.0.1:{port}/raw/tiles', **kwargs)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_download_tileset_streams_lines():
+    tiles = serve_and_download(b"First\r\n$Second\n\nFirst\nThird")
+
+    assert tiles == [
+        {'secret': False, 'name': 'First'},
+        {'secret': True, 'name': 'Second'},
+        {'secret': False, 'name': 'Third'},
+    ]
+
+
+def test_download_tileset_is_bounded():
+    with pytest.raises(helpers.DownloadTooLargeError):
+        serve_and_download(b"tile\n" * 1000, max_bytes=1024)
+
+
+def test_chunk_lines():
+    lines = [f"player {n} wins {n} place!" for n in range(200)]
+    chunks = helpers.chunk_lines(lines, limit=500)
+
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == lines
+    assert helpers.chunk_lines([]) == []
+
+
+class StalledAttachment:
+    size = 10
+
+    async def read(self):
+        await asyncio.sleep(60)
+
+
+def test_download_template_times_out(monkeypatch):
+    monkeypatch.setattr(helpers, 'DOWNLOAD_TIMEOUT', aiohttp.ClientTimeout(total=0.01))
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(helpers.download_template(StalledAttachment()))
+
+
+def test_download_tileset_accepts_long_lines():
+    long_title = "x" * 200_000
+    tiles = serve_and_download(f"First\n{long_title}\nLast".encode())
+
+    assert [tile['name'] for tile in tiles] == ["First", long_title, "Last"]
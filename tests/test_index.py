@@ -0,0 +1,52 @@
+from collections import namedtuple
+
+from bingo.index import FieldIndex
+
+import pytest
+
+IndexedField = namedtuple('IndexedField', ['index', 'title'])
+
+
+@pytest.fixture
+def fields():
+    with open("tests/test_bingo/fields.txt", "r") as f:
+        titles = f.read().splitlines()
+
+    return [IndexedField(n, title) for n, title in enumerate(titles)]
+
+
+def naive_search(fields, marked, query, limit=25):
+    return [field for field in fields
+            if query.casefold() in field.title.casefold() and field not in marked][:limit]
+
+
+@pytest.mark.parametrize(
+    "query", ["", "s", "SED", "qu", "tristique", "Tincidunt ultrices", "lorem ipsum x", "zzz"]
+)
+def test_search_matches_substring_scan(fields, query):
+    index = FieldIndex(fields)
+    marked = set(fields[::3])
+    for field in marked:
+        index.discard(field)
+
+    assert index.search(query) == naive_search(fields, marked, query)
+
+
+def test_get_by_title(fields):
+    index = FieldIndex(fields)
+
+    assert index.get(fields[3].title) is fields[3]
+    assert index.get("missing") is None
+
+    index.discard(fields[3])
+    assert index.get(fields[3].title) is fields[3]
+    assert fields[3] not in index.search(fields[3].title)
+
+
+def test_postings_are_built_on_first_long_query(fields):
+    index = FieldIndex(fields)
+    index.search("se")
+    assert index._postings is None
+
+    index.search("sed")
+    assert all(list(posting) == sorted(posting) for posting in index.postings.values())
@@ -0,0 +1,49 @@
+import asyncio
+
+from benchmarks.fakes import FakeRedis
+from utils.leaderboard import Leaderboard
+
+
+def finish_game(repository, leaderboard, winner_ids):
+    async def scenario():
+        await repository.finish_game(1, 0, winner_ids, [])
+        await leaderboard.invalidate(1)
+
+    asyncio.run(scenario())
+
+
+def test_leaderboard_follows_finished_games(repository):
+    client = FakeRedis()
+    leaderboard = Leaderboard(client, repository)
+
+    assert asyncio.run(leaderboard.top(1)) == []
+
+    finish_game(repository, leaderboard, [10, 20])
+    finish_game(repository, leaderboard, [20, 30])
+    finish_game(repository, leaderboard, [20])
+
+    assert asyncio.run(leaderboard.top(1)) == [(20, 3), (10, 1), (30, 1)]
+    assert asyncio.run(leaderboard.top(1, limit=1)) == [(20, 3)]
+
+
+def test_missing_set_is_rebuilt_from_database(repository):
+    leaderboard = Leaderboard(FakeRedis(), repository)
+    finish_game(repository, leaderboard, [10, 20])
+
+    # A fresh Redis, e.g. after a flush, is rebuilt from the database on read.
+    assert asyncio.run(Leaderboard(FakeRedis(), repository).top(1)) == [(10, 1), (20, 1)]
+
+
+def test_invalidate_heals_a_stale_set(repository):
+    client = FakeRedis()
+    leaderboard = Leaderboard(client, repository)
+    finish_game(repository, leaderboard, [10])
+    assert asyncio.run(leaderboard.top(1)) == [(10, 1)]
+
+    # Points committed while Redis was unreachable.
+    asyncio.run(repository.finish_game(1, 0, [10], []))
+    assert asyncio.run(leaderboard.top(1)) == [(10, 1)]
+
+    asyncio.run(leaderboard.invalidate(1))
+    asyncio.run(leaderboard.invalidate(1))
+    assert asyncio.run(leaderboard.top(1)) == [(10, 2)]
@@ -0,0 +1,79 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from bingo.helpers import render
+from bingo.helpers.executor import RenderExecutor
+from utils import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+def test_histogram_exposition(registry):
+    histogram = registry.register(metrics.Histogram('test_seconds', 'Test', buckets=(0.1, 1.0)))
+    histogram.observe(0.05, query='a')
+    histogram.observe(0.5, query='a')
+    histogram.observe(5, query='a')
+
+    lines = registry.expose().splitlines()
+    assert '# TYPE test_seconds histogram' in lines
+    assert 'test_seconds_bucket{query="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{query="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{query="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{query="a"} 3' in lines
+
+
+def test_collectors_refresh_gauges(registry):
+    gauge = registry.register(metrics.Gauge('test_players', 'Test'))
+    players = {1: 3}
+
+    def collect():
+        for channel_id, count in players.items():
+            gauge.set(count, channel=channel_id)
+
+    registry.add_collector(collect)
+    players[1] = 5
+
+    assert registry.summary() == ['test_players{channel="1"} 5']
+
+    registry.remove_collector(collect)
+    players[1] = 7
+    assert registry.summary() == ['test_players{channel="1"} 5']
+
+
+def test_render_reports_composite_and_encode_time():
+    job = render.RenderJob("template.png", tuple(f"Metric field {n}" for n in range(24)))
+    before = sum(count for _, _, count in metrics.BOARD_COMPOSITE_SECONDS.values.values())
+
+    executor = RenderExecutor("thread", workers=1)
+    try:
+        board = asyncio.run(executor.render(job))
+    finally:
+        executor.shutdown()
+
+    assert board.compose_seconds > 0
+    assert board.tile_seconds > 0
+    assert sum(count for _, _, count in metrics.BOARD_COMPOSITE_SECONDS.values.values()) == before + 1
+
+
+def test_metrics_endpoint(registry):
+    registry.register(metrics.Counter('test_total', 'Test')).inc(outcome='sent')
+
+    async def scrape():
+        runner = await metrics.start_server(0, registry=registry)
+        _, port = runner.addresses[0]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                    return response.status, await response.text()
+        finally:
+            await runner.cleanup()
+
+    status, text = asyncio.run(scrape())
+
+    assert status == 200
+    assert 'test_total{outcome="sent"} 1' in text
@@ -0,0 +1,21 @@
+import sqlalchemy
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+
+from database import model
+
+
+def test_migrations_build_the_schema_from_scratch(tmp_path, monkeypatch):
+    monkeypatch.setenv('DB_URI', f'sqlite:///{tmp_path / "fresh.db"}')
+    config = Config('alembic.ini')
+
+    command.upgrade(config, 'head')
+
+    engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "fresh.db"}')
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), model.Base.metadata) == []
+
+    command.downgrade(config, 'base')
+    assert sqlalchemy.inspect(engine).get_table_names() == ['alembic_version']
@@ -0,0 +1,23 @@
+import asyncio
+import json
+
+from benchmarks.fakes import FakeRedis
+from utils.notifications import WinnerNotifier
+
+
+def test_winners_are_published_in_one_pipeline():
+    client = FakeRedis()
+    notifier = WinnerNotifier(client)
+
+    events = [{'avatar': None, 'winner': f'player {n}', 'place': n} for n in range(1, 4)]
+    asyncio.run(notifier.publish(1, events))
+
+    assert client.round_trips == 1
+    assert [json.loads(message) for _, message in client.published] == events
+
+
+def test_nothing_to_publish():
+    client = FakeRedis()
+    asyncio.run(WinnerNotifier(client).publish(1, []))
+
+    assert client.round_trips == 0
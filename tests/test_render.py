@@ -1,4 +1,6 @@
 from bingo.helpers import render
+from bingo.helpers.cache import LRUCache
+from bingo.helpers.templates import TemplateStore
 from copy import copy
 from PIL import ImageChops, Image
 
@@ -17,3 +19,82 @@ def test_mark(field):
     difference = ImageChops.difference(marked_field, after_mark)
     assert difference.getdata() != \
            Image.new('RGBA', (render.FIELD_HEIGHT, render.FIELD_HEIGHT)).getdata()
+
+
+@pytest.mark.parametrize(
+    "name", ["Test field", "Lorem ipsum dolor sit amet, consectetur adipiscing elit.", "x" * 200]
+)
+def test_fit_text_picks_largest_fitting_size(name):
+    text, font_size, _ = render.fit_text(name)
+
+    if font_size + 1 < render.MAXIMUM_FONT_SIZE:
+        assert not render._fits(text, font_size + 1)[0]
+    if font_size > 0:
+        assert render._fits(text, font_size)[0]
+
+
+def test_get_field_is_cached():
+    render.tile_cache.clear()
+
+    plain = render.get_field("Cached field")
+    assert render.get_field("Cached field") is plain
+    assert render.get_field("Cached field", render.FIELD_MARKED) is not plain
+    assert render.get_field("First", render.FIELD_SECRET) is \
+           render.get_field("Second", render.FIELD_SECRET)
+
+    assert render.tile_cache.stats()['hits'] == 2
+    assert render.tile_cache.stats()['misses'] == 3
+
+
+def test_tile_cache_is_bounded():
+    cache = LRUCache(2)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    cache.get('a', lambda: 1)
+    cache.get('c', lambda: 3)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert len(cache) == 2
+
+
+def test_template_store_decodes_once():
+    render.templates.invalidate()
+
+    assert render.check_template_file("template.png")
+    assert not render.check_template_file("missing.png")
+
+    template = render.templates.get("template.png")
+    assert template.mode == 'RGBA'
+    assert render.templates.get("template.png") is template
+    assert render.templates.copy("template.png") is not template
+
+    render.templates.invalidate("template.png")
+    assert "template.png" not in render.templates
+
+
+def test_templates_are_content_addressed(tmp_path):
+    store = TemplateStore(f"{tmp_path}/")
+    with open("templates/template.png", "rb") as f:
+        data = f.read()
+
+    name = store.save(data)
+    assert store.save(data) == name
+    assert sorted(path.name for path in tmp_path.iterdir()) == [name, "raw"]
+
+    template = store.get(name)
+    assert template.mode == 'RGBA'
+    assert template.readonly
+    assert ImageChops.difference(template, render.templates.get("template.png")).getbbox() is None
+
+    board = store.copy(name)
+    board.paste(render.get_field("Test field"), (0, 0))
+    assert ImageChops.difference(store.get(name), template).getbbox() is None
+
+
+def test_compose_job_keeps_field_locations():
+    locations = [[list(corner) for corner in location] for location in render.FIELDS_LOCATION_PATTERN]
+
+    render.compose_job(render.RenderJob("template.png", tuple(f"Field {n}" for n in range(24))))
+
+    assert render.FIELDS_LOCATION_PATTERN == locations
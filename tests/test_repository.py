@@ -0,0 +1,58 @@
+import asyncio
+
+from database import model
+from sqlalchemy.orm import Session
+
+
+def test_tileset_roundtrip(repository):
+    tiles = [{'name': f'Tile {n}', 'secret': n == 0} for n in range(24)]
+
+    async def scenario():
+        assert not await repository.tileset_exists(1, 'set')
+        await repository.add_tileset(1, 'set', tiles)
+        assert await repository.tileset_exists(1, 'set')
+        assert not await repository.tileset_exists(2, 'set')
+
+        return await repository.get_tileset(1, 'set')
+
+    tiles_set_id, loaded_tiles = asyncio.run(scenario())
+    assert tiles_set_id is not None
+    assert all(tile['id'] is not None for tile in loaded_tiles)
+    assert sorted(({'name': tile['name'], 'secret': tile['secret']} for tile in loaded_tiles),
+                  key=lambda tile: tile['name']) == \
+           sorted(tiles, key=lambda tile: tile['name'])
+
+
+def test_template_roundtrip(repository):
+    async def scenario():
+        assert await repository.get_template(1, 'default') is None
+        await repository.add_template(1, 'default', '1_default.png')
+        return await repository.get_template(1, 'default')
+
+    assert asyncio.run(scenario()) == '1_default.png'
+
+
+def test_finish_game(repository):
+    tiles = [{'name': f'Tile {n}', 'secret': False} for n in range(24)]
+
+    async def scenario():
+        await repository.add_tileset(1, 'set', tiles)
+        tiles_set_id, loaded_tiles = await repository.get_tileset(1, 'set')
+        tile_ids = {tile['name']: tile['id'] for tile in loaded_tiles}
+
+        await repository.finish_game(1, tiles_set_id, [10, 20],
+                                     [tile_ids['Tile 0'], tile_ids['Tile 1']])
+        await repository.finish_game(1, tiles_set_id, [10], [tile_ids['Tile 0']])
+
+        return await repository.leaderboard(1), tiles_set_id, tile_ids
+
+    leaderboard, tiles_set_id, tile_ids = asyncio.run(scenario())
+    assert leaderboard == [(10, 2), (20, 1)]
+
+    with Session(repository.engine) as session:
+        assert session.get(model.TileSet, tiles_set_id).games_played == 2
+        assert session.get(model.Tile, tile_ids['Tile 0']).counter == 2
+        assert session.get(model.Tile, tile_ids['Tile 1']).counter == 1
+        assert session.get(model.Tile, tile_ids['Tile 2']).counter == 0
+        assert session.query(model.Winner).count() == 0
+        assert session.query(model.PlayerPoints).count() == 2
@@ -0,0 +1,45 @@
+import asyncio
+
+from benchmarks.fakes import FakeRedis
+from utils import sharding
+from utils.sharding import ChannelOwnership
+
+
+def test_shard_config(monkeypatch):
+    monkeypatch.delenv('SHARD_COUNT', raising=False)
+    monkeypatch.delenv('SHARD_IDS', raising=False)
+    assert sharding.shard_config() == (None, None)
+
+    monkeypatch.setenv('SHARD_COUNT', '4')
+    assert sharding.shard_config() == (None, 4)
+
+    monkeypatch.setenv('SHARD_IDS', '0,2')
+    assert sharding.shard_config() == ([0, 2], 4)
+
+
+def test_shard_for_guild():
+    guild_id = 81384788765712384
+    assert sharding.shard_for_guild(guild_id, 1) == 0
+    assert sharding.shard_for_guild(guild_id, 4) == (guild_id >> 22) % 4
+
+
+def test_channel_has_one_owner():
+    client = FakeRedis()
+    first = ChannelOwnership(client, worker='first')
+    second = ChannelOwnership(client, worker='second')
+
+    async def scenario():
+        assert await first.claim(1)
+        assert await first.claim(1)
+        assert not await second.claim(1)
+
+        assert await first.renew([1]) == []
+        assert await second.renew([1]) == [1]
+
+        await second.release(1)
+        assert not await second.claim(1)
+
+        await first.release(1)
+        assert await second.claim(1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+
+from benchmarks import simulate
+
+
+def test_simulated_game_end_to_end(monkeypatch):
+    monkeypatch.setenv('RENDER_EXECUTOR', 'thread')
+    monkeypatch.setenv('DM_RATE', '10000')
+
+    args = argparse.Namespace(players=20, tiles=24, marks=24, join_batch=10,
+                              mark_interval=0.0, dm_latency=0.0)
+    report = asyncio.run(simulate.simulate(args))
+
+    # With every tile of a 24-tile set marked, every player has a full board.
+    assert report['winners'] == 20
+    assert report['latency_ms']['bingo']['count'] == 20
+    assert report['latency_ms']['mark']['count'] == 24
+    assert report['dm']['sent'] > 0
+    assert report['dm']['failed'] == 0
@@ -0,0 +1,87 @@
+import asyncio
+
+from bingo import snapshot
+from bingo.main import Session
+from benchmarks.fakes import FakeRedis, FakeUser
+from utils.session_store import SessionStore
+
+import pytest
+
+
+def get_fields():
+    with open("tests/test_bingo/fields.txt", "r") as f:
+        return [{'id': n + 1, 'name': title, 'secret': n % 5 == 0}
+                for n, title in enumerate(f.read().splitlines())]
+
+
+@pytest.fixture
+def users():
+    return {user_id: FakeUser(user_id) for user_id in range(1, 6)}
+
+
+def play(session, users, store, channel_id):
+    async def scenario():
+        await store.save_session(channel_id, session, guild_id=7)
+
+        for user in list(users.values())[:3]:
+            await store.append_join(channel_id, session.add_player(user))
+
+        for field in session.fields[:10]:
+            field.mark()
+            await store.append_mark(channel_id, field)
+
+        for user in list(users.values())[3:]:
+            await store.append_join(channel_id, session.add_player(user))
+
+        for field in session.fields[10:]:
+            field.mark()
+            await store.append_mark(channel_id, field)
+
+    asyncio.run(scenario())
+
+
+def test_session_is_restored_from_log(users):
+    store = SessionStore(FakeRedis())
+    session = Session("template.png", get_fields(), tiles_set_id=3)
+    play(session, users, store, 42)
+
+    assert asyncio.run(store.channel_ids()) == [42]
+    meta, log = asyncio.run(store.load_session(42))
+    assert meta['guild_id'] == 7
+    assert sorted(snapshot.player_ids(log)) == sorted(users)
+
+    restored = snapshot.restore(meta, log, users)
+
+    assert restored.tiles_set_id == 3
+    assert [field.tile_id for field in restored.fields] == [field.tile_id for field in session.fields]
+    assert [field.marked for field in restored.fields] == [field.marked for field in session.fields]
+    assert all(field.is_sent for field in restored.fields if field.marked)
+
+    for user, player in session.players.items():
+        restored_player = restored.players[user]
+        assert [field.index for field in restored_player.board] == [field.index for field in player.board]
+        assert restored_player.state == player.state
+
+    assert [(winner.user.id, winner.victory_place, winner.victory_timestamp) for winner in restored.winners] == \
+           [(winner.user.id, winner.victory_place, winner.victory_timestamp) for winner in session.winners]
+
+
+def test_deleted_session_is_gone(users):
+    store = SessionStore(FakeRedis())
+    session = Session("template.png", get_fields(), tiles_set_id=3)
+    play(session, users, store, 42)
+
+    asyncio.run(store.delete_session(42))
+    assert asyncio.run(store.channel_ids()) == []
+    assert asyncio.run(store.load_session(42)) is None
+
+
+def test_join_stores_board_number(users):
+    session = Session("template.png", get_fields(), tiles_set_id=3, seed=11)
+    player = session.add_player(users[1])
+
+    assert snapshot.encode_join(player).split(' ')[3] == str(player.number)
+
+    restored = Session("template.png", get_fields(), tiles_set_id=3, seed=11)
+    assert restored.board_cells(player.number) == player.cells
+
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Hashable, NamedTuple
+
+import discord
+
+from utils import metrics
+
+
+class Delivery(NamedTuple):
+    user: discord.abc.Messageable
+    content: str
+    build_file: Callable[[], Awaitable[discord.File]]
+    enqueued_at: float
+
+
+class SendBudget:
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class DMDispatcher:
+    def __init__(self, workers: int = 8, rate: float = 40.0,
+                 retries: int = 4, backoff: float = 1.0):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.budget = SendBudget(rate)
+
+        # One mailbox per player, a newer board replaces an undelivered one.
+        self.mailboxes: dict[Hashable, Delivery] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.tasks: list[asyncio.Task] = []
+
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.latencies = deque(maxlen=1000)
+
+    def _count(self, outcome: str):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        metrics.DM_SENDS.inc(outcome=outcome)
+
+    def start(self):
+        self.tasks = [asyncio.get_running_loop().create_task(self._worker())
+                      for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, key: Hashable, user: discord.abc.Messageable, content: str,
+               build_file: Callable[[], Awaitable[discord.File]]):
+        previous = self.mailboxes.get(key)
+        if previous is not None:
+            self._count('coalesced')
+            self.mailboxes[key] = Delivery(user, content, build_file, previous.enqueued_at)
+            return
+
+        self.mailboxes[key] = Delivery(user, content, build_file, time.monotonic())
+        self.queue.put_nowait(key)
+
+    async def join(self):
+        await self.queue.join()
+
+    async def _worker(self):
+        while True:
+            key = await self.queue.get()
+            try:
+                delivery = self.mailboxes.pop(key, None)
+                if delivery is not None:
+                    await self._deliver(key, delivery)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._count('failed')
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, key: Hashable, delivery: Delivery):
+        for attempt in range(self.retries + 1):
+            # A newer board arrived while we were backing off, let it win.
+            if attempt and key in self.mailboxes:
+                self._count('coalesced')
+                return
+
+            await self.budget.acquire()
+            try:
+                await delivery.user.send(delivery.content, file=await delivery.build_file())
+            except discord.Forbidden:
+                # Closed DMs, retrying will not help.
+                self._count('failed')
+                return
+            except discord.HTTPException as error:
+                if error.status != 429 and error.status < 500:
+                    self._count('failed')
+                    return
+
+                self._count('retried')
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+            else:
+                self._count('sent')
+                self.latencies.append(time.monotonic() - delivery.enqueued_at)
+                return
+
+        self._count('failed')
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        return {
+            'queue_depth': len(self.mailboxes),
+            'sent': self.sent,
+            'failed': self.failed,
+            'coalesced': self.coalesced,
+            'retried': self.retried,
+            'latency_p50': percentile(0.5),
+            'latency_p99': percentile(0.99),
+        }
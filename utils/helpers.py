@@ -1,8 +1,24 @@
+import asyncio
 import re
-import requests
-import shutil
+import struct
 
-from typing import List
+import aiohttp
+import discord
+
+from bingo.helpers import render
+
+from typing import List, Optional, Tuple
+
+MAX_TILESET_BYTES = 256 * 1024
+MAX_TEMPLATE_BYTES = 8 * 1024 * 1024
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=15, sock_connect=5, sock_read=10)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class DownloadTooLargeError(Exception):
+    pass
 
 
 def is_pastebin_url(uri: str) -> bool:
@@ -13,24 +29,74 @@ def is_name_valid(name: str) -> bool:
     NAME_PATTERN = r'[A-Za-z0-9]'
     return bool(re.match(NAME_PATTERN, name))
 
-def download_tileset(pastebin_url: str) -> List[dict]:
-    r = requests.get(pastebin_url)
-    r.raise_for_status()
+def chunk_lines(lines: List[str], limit: int = 2000) -> List[str]:
+    # Discord rejects messages longer than 2000 characters.
+    chunks, chunk = [], ''
+    for line in lines:
+        if chunk and len(chunk) + len(line) + 1 > limit:
+            chunks.append(chunk)
+            chunk = ''
+
+        chunk = f'{chunk}\n{line}' if chunk else line[:limit]
+
+    if chunk:
+        chunks.append(chunk)
 
-    tiles_text = set(r.text.splitlines())
-    return [{
+    return chunks
+
+def parse_tile(tile_text: str) -> dict:
+    return {
         'secret': tile_text[0] == '$',
         'name': tile_text[1:].strip() if tile_text.startswith("$") else tile_text.strip()
-    } for tile_text in tiles_text if tile_text.strip() != '']
+    }
+
+async def download_tileset(pastebin_url: str, max_bytes: int = MAX_TILESET_BYTES) -> List[dict]:
+    tiles = {}
+    received = 0
+
+    def add_line(line: bytes):
+        tile_text = line.decode(charset, errors='replace').rstrip('\r')
+        if tile_text.strip() != '':
+            tiles.setdefault(tile_text, parse_tile(tile_text))
+
+    async with aiohttp.ClientSession(timeout=DOWNLOAD_TIMEOUT) as session:
+        async with session.get(pastebin_url) as r:
+            r.raise_for_status()
+
+            if (r.content_length or 0) > max_bytes:
+                raise DownloadTooLargeError(f'Tiles file is larger than {max_bytes} bytes')
+
+            charset = r.charset or 'utf-8'
+
+            # Parse chunk by chunk so an oversized body is cut off early. Lines are
+            # split here, aiohttp's line reader rejects lines above its buffer size.
+            pending = b''
+            async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise DownloadTooLargeError(f'Tiles file is larger than {max_bytes} bytes')
+
+                *lines, pending = (pending + chunk).split(b'\n')
+                for line in lines:
+                    add_line(line)
+
+            add_line(pending)
+
+    return list(tiles.values())
+
+def png_size(data: bytes) -> Optional[Tuple[int, int]]:
+    # Width and height are the first fields of the IHDR chunk right after the signature.
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b'IHDR':
+        return None
 
-def download_template(discord_cdn_url: str, channel_id: int, name: str) -> str:
-    r = requests.get(discord_cdn_url, stream=True)
-    r.raise_for_status()
+    return struct.unpack('>II', data[16:24])
 
-    r.raw.decode_content = True
+async def download_template(attachment: discord.Attachment, max_bytes: int = MAX_TEMPLATE_BYTES) -> bytes:
+    if attachment.size > max_bytes:
+        raise DownloadTooLargeError(f'Template is larger than {max_bytes} bytes')
 
-    filepath = f'{channel_id}_{name}.png'
-    with open(f'templates/{filepath}', 'wb') as f:
-        shutil.copyfileobj(r.raw, f)
+    return await asyncio.wait_for(attachment.read(), DOWNLOAD_TIMEOUT.total)
 
-    return filepath
+async def save_template(data: bytes) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, render.templates.save, data)
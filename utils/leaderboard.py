@@ -0,0 +1,38 @@
+from typing import List, Tuple
+
+import redis.asyncio as redis
+
+from database.repository import Repository
+
+TOP_PLAYERS = 10
+
+
+def leaderboard_key(channel_id: int) -> str:
+    return f'bingo:leaderboard:{channel_id}'
+
+
+class Leaderboard:
+    def __init__(self, client: redis.Redis, repository: Repository):
+        self.client = client
+        self.repository = repository
+
+    async def _rebuild(self, channel_id: int) -> bool:
+        totals = await self.repository.leaderboard(channel_id)
+        if not totals:
+            return False
+
+        await self.client.zadd(leaderboard_key(channel_id),
+                               {user_id: points for user_id, points in totals})
+        return True
+
+    async def invalidate(self, channel_id: int):
+        # Call after the points are in the database, the next read rebuilds the set
+        # from there, so a failed or repeated call can not leave wrong totals behind.
+        await self.client.delete(leaderboard_key(channel_id))
+
+    async def top(self, channel_id: int, limit: int = TOP_PLAYERS) -> List[Tuple[int, int]]:
+        results = await self.client.zrevrange(leaderboard_key(channel_id), 0, limit - 1, withscores=True)
+        if not results and await self._rebuild(channel_id):
+            results = await self.client.zrevrange(leaderboard_key(channel_id), 0, limit - 1, withscores=True)
+
+        return [(int(user_id), int(points)) for user_id, points in results]
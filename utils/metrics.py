@@ -0,0 +1,178 @@
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    labels = labels + extra
+    if not labels:
+        return ''
+
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        self.values[_labels(labels)] = value
+
+    def remove(self, **labels):
+        self.values.pop(_labels(labels), None)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+
+        # Per label set: bucket counts, sum and count.
+        self.values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        counts = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            counts[0][index] += 1
+        counts[1] += value
+        counts[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        for labels, (buckets, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', labels + (('le', repr(bound)),), cumulative
+            yield f'{self.name}_bucket', labels + (('le', '+Inf'),), count
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        # Collectors refresh gauges from state owned elsewhere right before export.
+        self.collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def collect(self):
+        for collector in self.collectors:
+            collector()
+
+    def expose(self) -> str:
+        self.collect()
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> List[str]:
+        self.collect()
+
+        lines = []
+        for metric in self.metrics:
+            for labels, value in metric.values.items():
+                name = f'{metric.name}{_format_labels(labels)}'
+                if isinstance(metric, Histogram):
+                    _, total, count = value
+                    lines.append(f'{name} count={count} avg={total / count * 1000:.2f}ms')
+                else:
+                    lines.append(f'{name} {value:g}')
+
+        return lines
+
+
+REGISTRY = Registry()
+
+TILE_RENDER_SECONDS = REGISTRY.register(Histogram(
+    'bingo_tile_render_seconds', 'Time spent rendering uncached tiles for one board'))
+BOARD_COMPOSITE_SECONDS = REGISTRY.register(Histogram(
+    'bingo_board_composite_seconds', 'Time to paste 24 tiles onto a template'))
+BOARD_ENCODE_SECONDS = REGISTRY.register(Histogram(
+    'bingo_board_encode_seconds', 'Time to encode one board, by profile'))
+BOARD_BYTES = REGISTRY.register(Counter(
+    'bingo_board_bytes_total', 'Encoded board bytes, by profile'))
+DB_QUERY_SECONDS = REGISTRY.register(Histogram(
+    'bingo_db_query_seconds', 'Database query time including the wait for a pool thread, by query'))
+REDIS_PUBLISH_SECONDS = REGISTRY.register(Histogram(
+    'bingo_redis_publish_seconds', 'Time to publish a batch of winner events'))
+DM_SENDS = REGISTRY.register(Counter(
+    'bingo_dm_sends_total', 'Board DMs by outcome'))
+DM_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'bingo_dm_queue_depth', 'Players with an undelivered board'))
+SESSION_PLAYERS = REGISTRY.register(Gauge(
+    'bingo_session_players', 'Players in a running game, by channel'))
+SESSION_FIELDS = REGISTRY.register(Gauge(
+    'bingo_session_fields', 'Tiles in a running game, by channel'))
+TILE_CACHE = REGISTRY.register(Gauge(
+    'bingo_tile_cache', 'Tile bitmap cache counters of this process'))
+
+
+async def start_server(port: int, host: str = '127.0.0.1', registry: Registry = REGISTRY) -> web.AppRunner:
+    async def handle(request):
+        return web.Response(text=registry.expose(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+
+    return runner
@@ -0,0 +1,43 @@
+import json
+from os import environ
+from typing import List
+
+import redis.asyncio as redis
+
+from utils import metrics
+
+
+def create_redis_client() -> redis.Redis:
+    pool = redis.ConnectionPool(
+        host=environ.get('REDIS_HOST', 'redis'),
+        port=int(environ.get('REDIS_PORT', 6379)),
+        db=int(environ.get('REDIS_DB', 0)),
+        max_connections=int(environ.get('REDIS_MAX_CONNECTIONS', 20)),
+    )
+
+    return redis.Redis(connection_pool=pool)
+
+
+def winner_event(player) -> dict:
+    return {
+        'avatar': None,
+        'winner': player.user.display_name,
+        'place': player.victory_place,
+    }
+
+
+class WinnerNotifier:
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def publish(self, channel_id: int, events: List[dict]):
+        if not events:
+            return
+
+        # Winners of the same mark go out in one round trip.
+        with metrics.REDIS_PUBLISH_SECONDS.time():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.publish(channel_id, json.dumps(event))
+
+                await pipe.execute()
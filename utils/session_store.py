@@ -0,0 +1,54 @@
+from typing import List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from bingo import snapshot
+from bingo.main import Player, Session
+
+SESSIONS_KEY = 'bingo:sessions'
+
+
+def meta_key(channel_id: int) -> str:
+    return f'bingo:session:{channel_id}'
+
+
+def log_key(channel_id: int) -> str:
+    return f'bingo:session:{channel_id}:log'
+
+
+class SessionStore:
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def save_session(self, channel_id: int, session: Session, guild_id: int = None):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(log_key(channel_id))
+            pipe.set(meta_key(channel_id), snapshot.encode_meta(session, guild_id))
+            pipe.sadd(SESSIONS_KEY, channel_id)
+            await pipe.execute()
+
+    async def append_join(self, channel_id: int, player: Player):
+        await self.client.rpush(log_key(channel_id), snapshot.encode_join(player))
+
+    async def append_mark(self, channel_id: int, field):
+        await self.client.rpush(log_key(channel_id), snapshot.encode_mark(field))
+
+    async def delete_session(self, channel_id: int):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(meta_key(channel_id), log_key(channel_id))
+            pipe.srem(SESSIONS_KEY, channel_id)
+            await pipe.execute()
+
+    async def channel_ids(self) -> List[int]:
+        return sorted(int(channel_id) for channel_id in await self.client.smembers(SESSIONS_KEY))
+
+    async def load_session(self, channel_id: int) -> Optional[Tuple[dict, list]]:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(meta_key(channel_id))
+            pipe.lrange(log_key(channel_id), 0, -1)
+            meta, log = await pipe.execute()
+
+        if meta is None:
+            return None
+
+        return snapshot.decode_meta(meta), log
@@ -0,0 +1,73 @@
+import os
+import socket
+from os import environ
+from typing import Iterable, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+OWNER_TTL = 30
+
+# Only touch the lease while it still carries our worker id.
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def shard_config() -> Tuple[Optional[List[int]], Optional[int]]:
+    shard_count = environ.get('SHARD_COUNT')
+    if not shard_count:
+        return None, None
+
+    shard_ids = environ.get('SHARD_IDS')
+    if not shard_ids:
+        return None, int(shard_count)
+
+    return [int(shard_id) for shard_id in shard_ids.split(',')], int(shard_count)
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    return (guild_id >> 22) % shard_count
+
+
+def worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def owner_key(channel_id: int) -> str:
+    return f'bingo:owner:{channel_id}'
+
+
+class ChannelOwnership:
+    def __init__(self, client: redis.Redis, worker: str = None, ttl: int = OWNER_TTL):
+        self.client = client
+        self.worker = worker or worker_id()
+        self.ttl = ttl
+
+    async def claim(self, channel_id: int) -> bool:
+        if await self.client.set(owner_key(channel_id), self.worker, nx=True, ex=self.ttl):
+            return True
+
+        owner = await self.client.get(owner_key(channel_id))
+        return owner is not None and owner.decode() == self.worker
+
+    async def renew(self, channel_ids: Iterable[int]) -> List[int]:
+        channel_ids = list(channel_ids)
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for channel_id in channel_ids:
+                pipe.eval(RENEW_SCRIPT, 1, owner_key(channel_id), self.worker, self.ttl)
+            renewed = await pipe.execute()
+
+        return [channel_id for channel_id, ok in zip(channel_ids, renewed) if not ok]
+
+    async def release(self, channel_id: int):
+        await self.client.eval(RELEASE_SCRIPT, 1, owner_key(channel_id), self.worker)